@@ -0,0 +1,171 @@
+from search_problem import *
+from search_algorithms import *
+import argparse, json, platform, random, subprocess, time, tracemalloc
+
+"""
+    Benchmarks for search_algorithms.py over seeded families of GridHunterProblem instances.
+    Every (instance, searcher) pair is run once with SearchStats for the node counts and wall time, and
+    once more under tracemalloc for the peak memory (tracemalloc slows the search down, so its run is
+    not timed). Results are written to a JSON file so runs from different commits can be compared:
+        python benchmark_searching.py --scale small --out bench.json
+"""
+
+# (N, number of monsters, health) per family; each family gets --instances seeded instances
+SCALES = {
+    'tiny': [(4, 1, 10), (5, 2, 10)],
+    'small': [(5, 2, 10), (5, 3, 10), (6, 3, 5), (7, 3, 10)],
+    'medium': [(6, 4, 10), (8, 4, 10), (10, 4, 5), (12, 5, 10)],
+}
+# tree-like searches are only run on instances with at most this many cells
+TREELIKE_MAX_CELLS = 25
+TREELIKE_TABLE_SIZE = 1 << 16
+
+SEARCHERS = [
+    ('Graph-like BFS', (lambda p, stats: breadth_first_search(p, stats=stats)), False),
+    ('Graph-like UCS', (lambda p, stats: uniform_cost_search(p, stats=stats)), False),
+    ('Graph-like Greedy', (lambda p, stats: greedy_search(p, h=p.h, stats=stats)), False),
+    ('Graph-like A*', (lambda p, stats: astar_search(p, h=p.h, stats=stats)), False),
+    ('Graph-like A* PDB', (lambda p, stats: astar_search(p, h=PatternDatabaseHeuristic(p), stats=stats)), False),
+    ('Tree-like BFS', (lambda p, stats: breadth_first_search(p, treelike=True, check_cycles=True,
+                                                             table_size=TREELIKE_TABLE_SIZE, stats=stats)), True),
+    ('Tree-like UCS', (lambda p, stats: uniform_cost_search(p, treelike=True, check_cycles=True,
+                                                            table_size=TREELIKE_TABLE_SIZE, stats=stats)), True),
+    ('Tree-like A*', (lambda p, stats: astar_search(p, h=p.h, treelike=True, check_cycles=True,
+                                                    table_size=TREELIKE_TABLE_SIZE, stats=stats)), True),
+]
+
+def make_problem(N, n_monsters, health, rng, packed=False):
+    # agent and monsters on distinct random cells, agent facing a random direction
+    cells = rng.sample([(row, col) for row in range(N) for col in range(N)], n_monsters + 1)
+    agent_row, agent_col = cells[0]
+    initial_agent_info = (agent_row, agent_col, rng.choice(DIRECTIONS), health)
+    return GridHunterProblem(initial_agent_info=initial_agent_info, N=N, monster_coords=cells[1:], packed=packed)
+
+def make_family(N, n_monsters, health, instances, seed, packed=False):
+    # one Random per family so adding a family does not change the instances of the others
+    rng = random.Random('{}-{}-{}-{}'.format(seed, N, n_monsters, health))
+    return [make_problem(N, n_monsters, health, rng, packed) for _ in range(instances)]
+
+def run_searcher(problem, search_algo, measure_memory=True):
+    stats = SearchStats()
+    start = time.perf_counter()
+    goal_node = search_algo(problem, stats)
+    seconds = time.perf_counter() - start
+    peak_memory = None
+    if measure_memory:
+        tracemalloc.start()
+        search_algo(problem, None)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {'seconds': seconds,
+            'nodes_generated': stats.nodes_generated,
+            'nodes_popped': stats.nodes_popped,
+            'nodes_per_sec': stats.nodes_generated / seconds if seconds > 0 else None,
+            'peak_frontier': stats.peak_frontier,
+            'peak_reached': stats.peak_reached,
+            'peak_memory_bytes': peak_memory,
+            'solution_cost': None if goal_node is None else goal_node.path_cost,
+            'solution_depth': None if goal_node is None else goal_node.depth}
+
+def run_hda_benchmark(scale='small', instances=2, seed=0, packed=False, worker_counts=(1, 2, 4), verbose=True):
+    # HDA* vs single-process A* on the same instances; speedup_per_core = speedup / workers
+    # both use the admissible PDB heuristic (built before timing) so their costs can be compared
+    results = []
+    for N, n_monsters, health in SCALES[scale]:
+        for index, problem in enumerate(make_family(N, n_monsters, health, instances, seed, packed)):
+            h = PatternDatabaseHeuristic(problem)
+            start = time.perf_counter()
+            astar_goal = astar_search(problem, h=h)
+            astar_seconds = time.perf_counter() - start
+            for workers in worker_counts:
+                expansions = []
+                start = time.perf_counter()
+                goal_node = hda_star_search(problem, h, workers=workers, expansions=expansions)
+                seconds = time.perf_counter() - start
+                record = {'N': N, 'monsters': n_monsters, 'health': health, 'instance': index, 'workers': workers,
+                          'astar_seconds': astar_seconds, 'hda_seconds': seconds,
+                          'speedup': astar_seconds / seconds, 'speedup_per_core': astar_seconds / seconds / workers,
+                          'expansions_per_worker': expansions,
+                          'astar_cost': None if astar_goal is None else astar_goal.path_cost,
+                          'hda_cost': None if goal_node is None else goal_node.path_cost}
+                results.append(record)
+                if verbose:
+                    print('N={:<3d} m={} h={:<3d} #{} HDA* x{:<2d} {:6.3f}s vs A* {:6.3f}s |{:5.2f} speedup |{:>6} cost'.format(
+                          N, n_monsters, health, index, workers, seconds, astar_seconds, record['speedup'],
+                          str(record['hda_cost'])))
+    return results
+
+def run_allocation_benchmark(scale='small', instances=2, seed=0, packed=False, verbose=True):
+    # graph-like UCS with and without the fast expand path: child nodes created per expanded node
+    results = []
+    for N, n_monsters, health in SCALES[scale]:
+        for index, problem in enumerate(make_family(N, n_monsters, health, instances, seed, packed)):
+            for fast_expand in (False, True):
+                stats = SearchStats()
+                start = time.perf_counter()
+                goal_node = uniform_cost_search(problem, fast_expand=fast_expand, stats=stats)
+                seconds = time.perf_counter() - start
+                record = {'N': N, 'monsters': n_monsters, 'health': health, 'instance': index,
+                          'fast_expand': fast_expand, 'seconds': seconds,
+                          'nodes_generated': stats.nodes_generated, 'nodes_allocated': stats.nodes_allocated,
+                          'nodes_popped': stats.nodes_popped,
+                          'allocations_per_expansion': stats.nodes_allocated / max(stats.nodes_popped, 1),
+                          'solution_cost': None if goal_node is None else goal_node.path_cost}
+                results.append(record)
+                if verbose:
+                    print('N={:<3d} m={} h={:<3d} #{} UCS fast_expand={:5} {:5.2f} allocations/expansion |{:7.3f}s'.format(
+                          N, n_monsters, health, index, str(fast_expand), record['allocations_per_expansion'], seconds))
+    return results
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmark(scale='small', instances=2, seed=0, packed=False, measure_memory=True, treelike=True, verbose=True):
+    results = []
+    for N, n_monsters, health in SCALES[scale]:
+        family = make_family(N, n_monsters, health, instances, seed, packed)
+        for index, problem in enumerate(family):
+            for name, search_algo, is_treelike in SEARCHERS:
+                if is_treelike and (not treelike or N * N > TREELIKE_MAX_CELLS):
+                    continue
+                record = {'N': N, 'monsters': n_monsters, 'health': health, 'instance': index,
+                          'initial_state': repr(problem.initial_state), 'searcher': name}
+                record.update(run_searcher(problem, search_algo, measure_memory))
+                results.append(record)
+                if verbose:
+                    print('N={:<3d} m={} h={:<3d} #{} {:18s} {:9,d} generated |{:11,.0f} nodes/sec |{:>6} cost'.format(
+                          N, n_monsters, health, index, name, record['nodes_generated'], record['nodes_per_sec'] or 0,
+                          str(record['solution_cost'])))
+    return {'commit': git_commit(),
+            'python': platform.python_version(),
+            'scale': scale, 'instances': instances, 'seed': seed, 'packed': packed,
+            'results': results}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the searches in search_algorithms.py')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--instances', type=int, default=2, help='instances per (N, monsters, health) family')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--packed', action='store_true', help='use packed int states')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc runs')
+    parser.add_argument('--no-treelike', action='store_true', help='skip the tree-like searches')
+    parser.add_argument('--hda', default=None, metavar='WORKERS',
+                        help='also compare HDA* with these worker counts (e.g. 1,2,4) against A*')
+    parser.add_argument('--allocations', action='store_true',
+                        help='also compare child allocations per expansion with and without fast_expand')
+    parser.add_argument('--out', default='benchmark_searching.json')
+    args = parser.parse_args()
+
+    report = run_benchmark(args.scale, args.instances, args.seed, args.packed,
+                           measure_memory=not args.no_memory, treelike=not args.no_treelike)
+    if args.hda:
+        report['hda_results'] = run_hda_benchmark(args.scale, args.instances, args.seed, args.packed,
+                                                  worker_counts=[int(w) for w in args.hda.split(',')])
+    if args.allocations:
+        report['allocation_results'] = run_allocation_benchmark(args.scale, args.instances, args.seed, args.packed)
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print('Wrote {} results to {}'.format(len(report['results']), args.out))
@@ -1,5 +1,9 @@
 import numpy as np
+from bisect import insort
 from copy import deepcopy
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing as mp
 
 def objective_f(state, S, T):
     """Returns the objective value f(B) of state.
@@ -49,12 +53,93 @@ def get_neighbor(state):
         
     return n_state
 
-def simulated_annealing(initial_state, S, T, initial_temp=1000):
+class GeometricSchedule:
+    """temp <- alpha * temp each iteration, stopping below min_temp (the default schedule)."""
+    def __init__(self, alpha=0.9999, min_temp=1e-14):
+        self.alpha = alpha
+        self.min_temp = min_temp
+    
+    def reset(self, initial_temp):
+        pass
+    
+    def next_temp(self, temp, iters, improved):
+        return temp * self.alpha
+
+class LinearSchedule:
+    """temp <- temp - step each iteration; with n_iters instead of step, temp reaches 0 after n_iters."""
+    def __init__(self, step=None, n_iters=None, min_temp=1e-14):
+        if (step is None) == (n_iters is None):
+            raise ValueError('give exactly one of step and n_iters')
+        self.step = step
+        self.n_iters = n_iters
+        self.min_temp = min_temp
+    
+    def reset(self, initial_temp):
+        self.delta = self.step if self.step is not None else initial_temp / self.n_iters
+    
+    def next_temp(self, temp, iters, improved):
+        return temp - self.delta
+
+class LogarithmicSchedule:
+    """temp = initial_temp / log(k + e) at iteration k. Cools very slowly, so pair it with max_iters,
+    max_stall or time_limit."""
+    def __init__(self, min_temp=1e-14):
+        self.min_temp = min_temp
+    
+    def reset(self, initial_temp):
+        self.initial_temp = initial_temp
+    
+    def next_temp(self, temp, iters, improved):
+        return self.initial_temp / np.log(iters + 1 + np.e)
+
+class AdaptiveSchedule:
+    """Geometric cooling with reheating: after patience iterations without a new best objective the
+    temperature is raised back to reheat_fraction * initial_temp, at most max_reheats times."""
+    def __init__(self, alpha=0.9999, patience=10000, reheat_fraction=0.5, max_reheats=5, min_temp=1e-14):
+        self.alpha = alpha
+        self.patience = patience
+        self.reheat_fraction = reheat_fraction
+        self.max_reheats = max_reheats
+        self.min_temp = min_temp
+    
+    def reset(self, initial_temp):
+        self.initial_temp = initial_temp
+        self.reheats = 0
+        self.since_improved = 0
+    
+    def next_temp(self, temp, iters, improved):
+        self.since_improved = 0 if improved else self.since_improved + 1
+        if self.since_improved >= self.patience and self.reheats < self.max_reheats:
+            self.reheats += 1
+            self.since_improved = 0
+            return max(temp, self.reheat_fraction * self.initial_temp)
+        return temp * self.alpha
+
+def out_of_budget(iters, stall, max_iters, max_stall, deadline):
+    # Early-stop criteria shared by the annealing loops (None disables a criterion)
+    return ((max_iters is not None and iters >= max_iters) or (max_stall is not None and stall >= max_stall)
+            or (deadline is not None and perf_counter() > deadline))
+
+def simulated_annealing(initial_state, S, T, initial_temp=1000, schedule=None, max_stall=None, max_iters=None,
+                        time_limit=None):
+    """Simulated annealing for subset sum. Returns (final state, iterations).
+    
+    schedule: cooling schedule (GeometricSchedule(0.9999, 1e-14) by default); the run stops once the
+        temperature is below schedule.min_temp
+    max_stall: stop after this many iterations without a new best objective value
+    max_iters / time_limit: stop after this many iterations / seconds
+    With the defaults the run is the original one: same random draws, state and iteration count.
+    """
     # 1. Set temperature to initial_temp
     temp = initial_temp
+    schedule = GeometricSchedule() if schedule is None else schedule
+    schedule.reset(initial_temp)
+    deadline = None if time_limit is None else perf_counter() + time_limit
     
     # 2. Set current state to initial_state
     current = initial_state
+    current_f = objective_f(current, S, T)
+    best_f, stall, improved = current_f, 0, False
     
     # 3. Initialize iteration counter
     iters = 0
@@ -62,33 +147,261 @@ def simulated_annealing(initial_state, S, T, initial_temp=1000):
     # 4. Main loop with exact condition
     while temp >= 0:
         # a. The scheduler update
-        temp = temp * 0.9999
+        temp = schedule.next_temp(temp, iters, improved)
         
-        # b. Check if temperature too low
-        if temp < 1e-14:
+        # b. Check if temperature too low, or out of budget
+        if temp < schedule.min_temp or out_of_budget(iters, stall, max_iters, max_stall, deadline):
             return current, iters
             
         # c. Check if goal reached
-        if objective_f(current, S, T) == 0:
+        if current_f == 0:
             return current, iters
             
         # d. Generate random successor
         next_state = get_neighbor(current)
         
         # e. Compute deltaE as specified
-        deltaE = objective_f(current, S, T) - objective_f(next_state, S, T)
+        next_f = objective_f(next_state, S, T)
+        deltaE = current_f - next_f
         
         # f. If improvement, accept it
         if deltaE > 0:
-            current = next_state
+            current, current_f = next_state, next_f
         # g. If not improvement, maybe accept it with specific probability
         elif deltaE <= 0:
             u = np.random.uniform()
             if u <= np.exp(deltaE/temp):
-                current = next_state
+                current, current_f = next_state, next_f
+        
+        # track the best objective value for stall detection and adaptive schedules
+        improved = current_f < best_f
+        if improved:
+            best_f, stall = current_f, 0
+        else:
+            stall += 1
             
         # h. Increment iteration counter
         iters += 1
     
     # 5. Return final values
-    return current, iters
\ No newline at end of file
+    return current, iters
+
+
+class SubsetFlipNeighborhood:
+    """One-bit-flip neighborhood of a 0/1 state, updated in place.
+    
+    propose() picks a bit to flip with the same distribution as get_neighbor (remove or add with
+    probability 1/2 when both on and off bits exist, then a uniform on or off index) in O(1) and
+    without copying the state; apply(idx) performs the flip, and a rejected proposal needs no undo.
+    The on and off indices are kept in two arrays, with slot[i] giving the position of index i in
+    its array, so a flip is a swap-remove from one array and an append to the other.
+    With ordered=True the arrays are kept sorted instead (a flip then costs O(n) for the list
+    insert), which makes propose() consume np.random exactly like get_neighbor and pick the same bit.
+    """
+    def __init__(self, state, ordered=False):
+        self.state = state
+        self.ordered = ordered
+        self.on = [i for i, x in enumerate(state) if x == 1]
+        self.off = [i for i, x in enumerate(state) if x == 0]
+        self.slot = [0] * len(state)
+        for indices in (self.on, self.off):
+            for pos, i in enumerate(indices):
+                self.slot[i] = pos
+        self.n = len(state)
+
+    def propose(self):
+        # Returns (index to flip, True if the flip removes it from the subset)
+        if 0 < len(self.on) < self.n:
+            remove = np.random.uniform() < 0.5
+        else:
+            remove = len(self.on) == self.n
+        indices = self.on if remove else self.off
+        return indices[np.random.choice(len(indices))], remove
+
+    def apply(self, idx):
+        remove = self.state[idx] == 1
+        source, target = (self.on, self.off) if remove else (self.off, self.on)
+        if self.ordered:
+            source.remove(idx)
+            insort(target, idx)
+        else:
+            # swap-remove idx from source, append it to target
+            pos, last = self.slot[idx], source[-1]
+            source[pos] = last
+            self.slot[last] = pos
+            source.pop()
+            self.slot[idx] = len(target)
+            target.append(idx)
+        self.state[idx] = 0 if remove else 1
+
+def simulated_annealing_incremental(initial_state, S, T, initial_temp=1000, match_get_neighbor=True, schedule=None,
+                                    max_stall=None, max_iters=None, time_limit=None, shared_best=None):
+    """Same search as simulated_annealing, without the O(n) work per iteration.
+    
+    The subset sum of the current state is kept up to date, so the objective and deltaE of a
+    one-bit flip cost O(1), and neighbors come from a SubsetFlipNeighborhood updated in place.
+    With match_get_neighbor=True (ordered index lists) random numbers are drawn and used exactly
+    as in simulated_annealing, so for the same np.random state the final state and iteration count
+    are identical. match_get_neighbor=False makes every flip O(1); the moves have the same
+    distribution but a different random stream.
+    schedule, max_stall, max_iters and time_limit are as in simulated_annealing.
+    shared_best: optional multiprocessing.Value shared by several runs; it is lowered to every new best
+    objective value, and the run stops as soon as it reads 0 (some run solved the instance).
+    """
+    schedule = GeometricSchedule() if schedule is None else schedule
+    schedule.reset(initial_temp)
+    deadline = None if time_limit is None else perf_counter() + time_limit
+    S_values = [int(s) for s in S]
+    current = deepcopy(initial_state)
+    neighborhood = SubsetFlipNeighborhood(current, ordered=match_get_neighbor)
+    subset_sum = sum(S_values[i] for i in neighborhood.on)
+    best_f, stall, improved = abs(T - subset_sum), 0, False
+    if shared_best is not None: # publish the starting value too, so a run that starts solved stops the others
+        with shared_best.get_lock():
+            shared_best.value = min(shared_best.value, best_f)
+    temp = initial_temp
+    iters = 0
+    while temp >= 0:
+        temp = schedule.next_temp(temp, iters, improved)
+        if temp < schedule.min_temp or out_of_budget(iters, stall, max_iters, max_stall, deadline):
+            return current, iters
+        if shared_best is not None and shared_best.value == 0:
+            return current, iters
+        current_f = abs(T - subset_sum)
+        if current_f == 0:
+            return current, iters
+        
+        idx, remove = neighborhood.propose()
+        next_sum = subset_sum - S_values[idx] if remove else subset_sum + S_values[idx]
+        
+        deltaE = current_f - abs(T - next_sum)
+        if deltaE > 0 or np.random.uniform() <= np.exp(deltaE/temp):
+            neighborhood.apply(idx)
+            subset_sum = next_sum
+        improved = abs(T - subset_sum) < best_f
+        if improved:
+            best_f, stall = abs(T - subset_sum), 0
+            if shared_best is not None:
+                with shared_best.get_lock():
+                    shared_best.value = min(shared_best.value, best_f)
+        else:
+            stall += 1
+        iters += 1
+    return current, iters
+
+def simulated_annealing_batch(initial_states, S, T, initial_temp=1000, seed=None, max_iters=None, time_limit=None):
+    """Runs K independent annealing chains at once with NumPy.
+    
+    Args:
+        initial_states: K x n array of 0/1 values, one initial state per chain
+        S: Numpy 1D array of integers
+        T: Target sum integer
+        initial_temp: Initial temperature, a number or one per chain
+        seed: Seed for the np.random.default_rng stream shared by all chains
+        max_iters / time_limit: stop every chain after this many iterations / seconds
+    
+    Every chain follows simulated_annealing (same cooling, stopping rules, neighbor distribution and
+    acceptance test); a chain that stops is frozen while the others continue. The random stream
+    differs from simulated_annealing, so single runs are not reproduced draw for draw.
+    Returns (final states as a K x n uint8 array, iterations per chain, objective value per chain).
+    """
+    rng = np.random.default_rng(seed)
+    final_states = (np.asarray(initial_states) == 1).astype(np.uint8)
+    K, n = final_states.shape
+    S = np.asarray(S, dtype=np.int64)
+    final_iters = np.zeros(K, dtype=np.int64)
+    final_f = np.zeros(K, dtype=np.int64)
+    # working arrays hold only the chains still running (chains[j] is the chain in row j); they are
+    # compacted whenever chains stop, so late iterations only pay for the chains left
+    chains = np.arange(K)
+    states = final_states.copy()
+    sums = states.astype(np.int64) @ S
+    temps = np.broadcast_to(np.asarray(initial_temp, dtype=float), (K,)).copy()
+    iters = np.zeros(K, dtype=np.int64)
+    deadline = None if time_limit is None else perf_counter() + time_limit
+    while len(chains) > 0:
+        # a. cooling, b./c. stop chains that are too cold, out of budget or at the goal
+        temps *= 0.9999
+        current_f = np.abs(T - sums)
+        done = (temps < 1e-14) | (current_f == 0)
+        if out_of_budget(iters[0], 0, max_iters, None, deadline): # all running chains have the same count
+            done[:] = True
+        if done.any():
+            stopped = chains[done]
+            final_states[stopped], final_iters[stopped], final_f[stopped] = states[done], iters[done], current_f[done]
+            keep = ~done
+            chains, states, sums, temps, iters, current_f = (chains[keep], states[keep], sums[keep], temps[keep],
+                                                             iters[keep], current_f[keep])
+            if len(chains) == 0:
+                break
+        live = len(chains)
+        
+        # d. propose one flip per chain: remove with probability 1/2 when both on and off bits
+        #    exist, then a uniform index among the on (or off) bits
+        n_on = states.sum(axis=1)
+        remove = np.where((n_on > 0) & (n_on < n), rng.random(live) < 0.5, n_on == n)
+        candidates = states == remove[:, None]
+        counts = np.where(remove, n_on, n - n_on)
+        picks = (rng.random(live) * counts).astype(np.int64)
+        idx = (np.cumsum(candidates, axis=1) > picks[:, None]).argmax(axis=1)
+        next_sums = np.where(remove, sums - S[idx], sums + S[idx])
+        
+        # e.-g. accept improvements, and worse moves with probability exp(deltaE/temp)
+        deltaE = current_f - np.abs(T - next_sums)
+        with np.errstate(over='ignore'):
+            accept = (deltaE > 0) | (rng.random(live) <= np.exp(deltaE / temps))
+        rows = np.flatnonzero(accept)
+        states[rows, idx[rows]] ^= 1
+        sums[rows] = next_sums[rows]
+        
+        # h. count the iteration
+        iters += 1
+    return final_states, final_iters, final_f
+
+# shared best objective value of the worker processes of parallel_simulated_annealing
+_shared_best = None
+
+def _init_annealing_worker(shared_best):
+    global _shared_best
+    _shared_best = shared_best
+
+def _annealing_chain(args):
+    chain, seed_sequence, initial_state, S, T, initial_temp, options = args
+    # each chain seeds the global np.random stream (used by the annealers) from its own SeedSequence
+    np.random.seed(seed_sequence.generate_state(1)[0])
+    if initial_state is None:
+        initial_state = np.random.randint(0, 2, size=len(S)).astype(float)
+    final_state, iters = simulated_annealing_incremental(initial_state, S, T, initial_temp=initial_temp,
+                                                         shared_best=_shared_best, **options)
+    return chain, final_state, iters, objective_f(final_state, S, T)
+
+def parallel_simulated_annealing(S, T, n_chains=8, initial_states=None, initial_temp=1000, seed=None,
+                                 max_workers=None, **options):
+    """Runs independent annealing restarts in a process pool and returns the best one.
+    
+    Args:
+        S, T: Subset sum instance
+        n_chains: Number of chains (ignored when initial_states is given)
+        initial_states: One initial state per chain; None draws a random state per chain
+        seed: Root seed; chain i uses np.random.SeedSequence(seed).spawn(n_chains)[i], so each chain's
+            random stream does not depend on the number of workers or on the other chains
+        options: Passed on to simulated_annealing_incremental (schedule, max_stall, max_iters, ...)
+    
+    The chains share their best objective value through a multiprocessing.Value and all stop as soon
+    as one of them reaches 0, so where a chain stops can depend on the others; without a solution
+    every chain runs its own course and the results are reproducible.
+    Returns (best final state, its objective value, [(final state, iterations, objective) per chain]).
+    """
+    if initial_states is not None:
+        n_chains = len(initial_states)
+    seed_sequences = np.random.SeedSequence(seed).spawn(n_chains)
+    shared_best = mp.Value('d', float('inf'))
+    tasks = [(chain, seed_sequences[chain], None if initial_states is None else initial_states[chain],
+              S, T, initial_temp, options) for chain in range(n_chains)]
+    results = [None] * n_chains
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_annealing_worker,
+                             initargs=(shared_best,)) as executor:
+        for chain, final_state, iters, fcost in executor.map(_annealing_chain, tasks):
+            results[chain] = (final_state, iters, fcost)
+    best = min(range(n_chains), key=(lambda chain: results[chain][2]))
+    return results[best][0], results[best][2], results
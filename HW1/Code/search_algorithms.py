@@ -1,4 +1,13 @@
 import heapq
+from array import array
+from collections import OrderedDict
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing as mp
+import queue
+import zlib
+import os, shutil, tempfile
+import numpy as np
 
 class PriorityQueue:
     def __init__(self, items=(), priority_function=(lambda x: x)): 
@@ -27,7 +36,133 @@ class PriorityQueue:
     def __len__(self):
         return len(self.pqueue)
 
+class IndexedPriorityQueue:
+    """
+    Addressable binary heap. Every item is identified by key_function(item) (e.g. node.state),
+    and self.index maps each key to its slot in the heap, so the PQ holds at most one entry per key.
+    Adding an item whose key is already queued replaces the old entry in place (decrease-key, or
+    increase-key) instead of pushing a duplicate, so stale entries are never popped.
+    Entries are (priority, key, item) triples, so ties in priority are broken by key and keys
+    must be comparable with each other.
+    """
+    def __init__(self, items=(), priority_function=(lambda x: x), key_function=(lambda x: x)):
+        self.priority_function = priority_function
+        self.key_function = key_function
+        self.pqueue = [] # heap of (priority, key, item) triples
+        self.index = {} # key -> slot of its entry in self.pqueue
+        for item in items:
+            self.add(item)
+
+    """
+    Add item to PQ with priority-value given by call to priority_function.
+    If an item with the same key is already queued, it is replaced by item and re-positioned.
+    """
+    def add(self, item):
+        key = self.key_function(item)
+        entry = (self.priority_function(item), key, item)
+        slot = self.index.get(key)
+        if slot is None:
+            self.pqueue.append(entry)
+            self._sift_up(len(self.pqueue) - 1)
+        else:
+            old_entry = self.pqueue[slot]
+            self.pqueue[slot] = entry
+            if entry < old_entry:
+                self._sift_up(slot)
+            else:
+                self._sift_down(slot)
+
+    """
+    pop and return item from PQ with min priority-value
+    """
+    def pop(self):
+        pqueue = self.pqueue
+        last = pqueue.pop()
+        if not pqueue:
+            del self.index[last[1]]
+            return last[2]
+        top = pqueue[0]
+        pqueue[0] = last
+        del self.index[top[1]]
+        self._sift_down(0)
+        return top[2]
+
+    """
+    return (without removing) the item with min priority-value
+    """
+    def peek(self):
+        return self.pqueue[0][2]
+
+    """
+    remove the queued item with the given key (if any), without popping the rest
+    """
+    def discard(self, key):
+        slot = self.index.pop(key, None)
+        if slot is None:
+            return
+        last = self.pqueue.pop()
+        if slot < len(self.pqueue):
+            removed = self.pqueue[slot]
+            self.pqueue[slot] = last
+            if last < removed:
+                self._sift_up(slot)
+            else:
+                self._sift_down(slot)
+
+    """
+    gets the queued item with the given key, or default if that key is not queued
+    """
+    def get(self, key, default=None):
+        slot = self.index.get(key)
+        if slot is None:
+            return default
+        return self.pqueue[slot][2]
+
+    def __contains__(self, key):
+        return key in self.index
+
+    """
+    gets number of items in PQ
+    """
+    def __len__(self):
+        return len(self.pqueue)
+
+    def _sift_up(self, slot):
+        pqueue, index = self.pqueue, self.index
+        entry = pqueue[slot]
+        while slot > 0:
+            parent = (slot - 1) >> 1
+            parent_entry = pqueue[parent]
+            if not entry < parent_entry:
+                break
+            pqueue[slot] = parent_entry
+            index[parent_entry[1]] = slot
+            slot = parent
+        pqueue[slot] = entry
+        index[entry[1]] = slot
+
+    def _sift_down(self, slot):
+        pqueue, index = self.pqueue, self.index
+        size = len(pqueue)
+        entry = pqueue[slot]
+        while True:
+            child = 2 * slot + 1
+            if child >= size:
+                break
+            if child + 1 < size and pqueue[child + 1] < pqueue[child]:
+                child += 1
+            child_entry = pqueue[child]
+            if not child_entry < entry:
+                break
+            pqueue[slot] = child_entry
+            index[child_entry[1]] = slot
+            slot = child
+        pqueue[slot] = entry
+        index[entry[1]] = slot
+
 class Node:
+    __slots__ = ('state', 'parent_node', 'action_from_parent', 'path_cost', 'depth', 'h', 'f')
+
     def __init__(self, state, parent_node=None, action_from_parent=None, path_cost=0):
         self.state = state
         self.parent_node = parent_node
@@ -37,89 +172,1222 @@ class Node:
             self.depth = 0
         else:
             self.depth = self.parent_node.depth + 1
+        self.h = None # heuristic value, filled in by a HeuristicCache
+        self.f = None # priority value, computed once when the node is created
     
+    @property
+    def g(self):
+        return self.path_cost
+
+    """
+    create a child node of this node (used by expand, so other node types can store it differently)
+    """
+    def child(self, state, action, path_cost):
+        return Node(state, self, action, path_cost)
+
     def __lt__(self, other):
         return self.state < other.state 
 
+class ActionTable:
+    """
+    Interns actions as small integer ids (0, 1, 2, ...) in order of first use.
+    """
+    def __init__(self, actions=()):
+        self.actions = []
+        self.ids = {}
+        for action in actions:
+            self.intern(action)
+
+    def intern(self, action):
+        action_id = self.ids.get(action)
+        if action_id is None:
+            action_id = len(self.actions)
+            self.ids[action] = action_id
+            self.actions.append(action)
+        return action_id
+
+    def __getitem__(self, action_id):
+        return self.actions[action_id]
+
+    def __len__(self):
+        return len(self.actions)
+
+class SearchTree:
+    """
+    Parent-pointer-array storage for a search tree. Node i is stored as row i of parallel
+    array buffers (parent id, action id, path cost, depth) plus its state, with actions
+    interned as small ids by an ActionTable.
+    Pass an instance as node_factory to any search, e.g. astar_search(p, p.h, node_factory=SearchTree()).
+    best_first_search then keeps node ids (not node objects) in its frontier and reached table and
+    only adds a row for children it accepts; the goal is returned as a TreeNode handle.
+    Path costs are stored as integers (typecode 'q') until a non-integer cost is added, which switches
+    the buffer to floats ('d'); pass cost_typecode='d' to store floats from the start.
+    A SearchTree records a single search; use a fresh one per call.
+    """
+    def __init__(self, action_table=None, cost_typecode='q'):
+        self.action_table = ActionTable() if action_table is None else action_table
+        self.states = []
+        self.parents = array('q')
+        self.action_ids = array('H')
+        self.path_costs = array(cost_typecode)
+        self.depths = array('L')
+
+    """
+    create the root node of the tree (same call signature as Node for the root)
+    """
+    def __call__(self, state):
+        return TreeNode(self, self.add(state, -1, 0, 0))
+
+    """
+    append a row for a new node and return its node id
+    """
+    def add(self, state, parent_id, action_id, path_cost):
+        node_id = len(self.states)
+        try:
+            self.path_costs.append(path_cost)
+        except TypeError: # first non-integer cost: switch to float storage
+            self.path_costs = array('d', self.path_costs)
+            self.path_costs.append(path_cost)
+        self.states.append(state)
+        self.parents.append(parent_id)
+        self.action_ids.append(action_id)
+        self.depths.append(0 if parent_id < 0 else self.depths[parent_id] + 1)
+        return node_id
+
+    def __len__(self):
+        return len(self.states)
+
+class TreeNode:
+    """
+    Handle to node node_id of a SearchTree; exposes the same attributes as Node.
+    """
+    __slots__ = ('tree', 'node_id', 'h', 'f')
+
+    def __init__(self, tree, node_id):
+        self.tree = tree
+        self.node_id = node_id
+        self.h = None
+        self.f = None
+
+    @property
+    def state(self):
+        return self.tree.states[self.node_id]
+
+    @property
+    def parent_node(self):
+        parent_id = self.tree.parents[self.node_id]
+        return None if parent_id < 0 else TreeNode(self.tree, parent_id)
+
+    @property
+    def action_id(self):
+        return self.tree.action_ids[self.node_id]
+
+    @property
+    def action_from_parent(self):
+        if self.tree.parents[self.node_id] < 0:
+            return None
+        return self.tree.action_table[self.tree.action_ids[self.node_id]]
+
+    @property
+    def path_cost(self):
+        return self.tree.path_costs[self.node_id]
+
+    @property
+    def g(self):
+        return self.tree.path_costs[self.node_id]
+
+    @property
+    def depth(self):
+        return self.tree.depths[self.node_id]
+
+    def child(self, state, action, path_cost):
+        tree = self.tree
+        return TreeNode(tree, tree.add(state, self.node_id, tree.action_table.intern(action), path_cost))
+
+    def __lt__(self, other):
+        return self.state < other.state
+
+class HeuristicCache:
+    """
+    Memoizes a heuristic h(node) per state, so the same state is never evaluated twice.
+    The value is also stored on the node as node.h. At most maxsize states are kept
+    (oldest entries are evicted first); maxsize=None keeps every state.
+    Only valid for heuristics that depend on node.state alone.
+    """
+    _missing = object() # marks a state not in the table (h may legitimately return None)
+
+    def __init__(self, h, maxsize=1 << 20):
+        self.h = h
+        self.maxsize = maxsize
+        self.table = OrderedDict()
+
+    def __call__(self, node):
+        value = self.table.get(node.state, self._missing)
+        if value is self._missing:
+            value = self.h(node)
+            if self.maxsize is not None and len(self.table) >= self.maxsize:
+                self.table.popitem(last=False)
+            self.table[node.state] = value
+        node.h = value
+        return value
+
+def cached_heuristic(h, h_cache_size=1 << 20):
+    # h_cache_size=0 disables memoization, None makes the table unbounded
+    if h_cache_size == 0 or isinstance(h, HeuristicCache):
+        return h
+    return HeuristicCache(h, maxsize=h_cache_size)
+
+class AncestorSet:
+    """
+    States on the path from the root to the most recently expanded node, for cycle checks in
+    tree-like search. move_to(node) only walks up from node until it meets the current path, then
+    swaps the diverging tail, so consecutive expansions along one branch (as in DFS) cost O(1).
+    Nodes are anything parent_of / depth_of / state_of understand (Node objects or SearchTree ids).
+    """
+    def __init__(self, parent_of=(lambda n: n.parent_node), depth_of=(lambda n: n.depth),
+                 state_of=(lambda n: n.state)):
+        self.parent_of, self.depth_of, self.state_of = parent_of, depth_of, state_of
+        self.path = [] # path[d] is the ancestor at depth d
+        self.states = set()
+
+    def move_to(self, node):
+        path, states = self.path, self.states
+        new_tail = []
+        while node is not None:
+            depth = self.depth_of(node)
+            if depth < len(path) and path[depth] == node:
+                break
+            new_tail.append(node)
+            node = self.parent_of(node)
+        keep = 0 if node is None else self.depth_of(node) + 1
+        for old in path[keep:]:
+            states.discard(self.state_of(old))
+        del path[keep:]
+        for new in reversed(new_tail):
+            path.append(new)
+            states.add(self.state_of(new))
+
+    def __contains__(self, state):
+        return state in self.states
+
+class TranspositionTable:
+    """
+    Bounded state -> best path cost table for tree-like search: a child is pruned when its state
+    was already generated at a cost no higher. At most maxsize states are kept (oldest first out).
+    """
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.table = OrderedDict()
+
+    """
+    record state at path_cost, returning False if it should be pruned
+    """
+    def admit(self, state, path_cost):
+        best = self.table.get(state)
+        if best is not None and best <= path_cost:
+            return False
+        if best is None and len(self.table) >= self.maxsize:
+            self.table.popitem(last=False)
+        self.table[state] = path_cost
+        return True
+
+class SearchStats:
+    """
+    Counters filled in by a search when passed as stats=SearchStats() (searches skip all bookkeeping
+    when stats is None):
+        nodes_generated: children produced by expanding nodes
+        nodes_allocated: child nodes actually created (best_first_search with fast_expand only creates
+                         nodes for children that improve on reached)
+        nodes_popped: nodes taken off the frontier
+        peak_frontier / peak_reached: largest frontier / reached-table size seen
+        reopened: children re-queued for a state whose node had already been popped
+        phase_times: wall time in seconds per phase ('setup': building the root and frontier,
+                     'search': the main loop)
+    One SearchStats can be shared by several searches; counters then add up (peaks take the max).
+    """
+    def __init__(self):
+        self.nodes_generated = 0
+        self.nodes_allocated = 0
+        self.nodes_popped = 0
+        self.peak_frontier = 0
+        self.peak_reached = 0
+        self.reopened = 0
+        self.phase_times = {}
+        self._phase = None
+
+    def start_phase(self, name):
+        # end the current phase (if any) and start timing phase name
+        now = perf_counter()
+        if self._phase is not None:
+            phase, started = self._phase
+            self.phase_times[phase] = self.phase_times.get(phase, 0.0) + now - started
+        self._phase = None if name is None else (name, now)
+
+    def end_phase(self):
+        self.start_phase(None)
+
+    def pushed(self, frontier_size, reached_size=0, reopened=False):
+        if frontier_size > self.peak_frontier:
+            self.peak_frontier = frontier_size
+        if reached_size > self.peak_reached:
+            self.peak_reached = reached_size
+        if reopened:
+            self.reopened += 1
+
+    def as_dict(self):
+        return {'nodes_generated': self.nodes_generated, 'nodes_allocated': self.nodes_allocated,
+                'nodes_popped': self.nodes_popped,
+                'peak_frontier': self.peak_frontier, 'peak_reached': self.peak_reached,
+                'reopened': self.reopened, 'phase_times': dict(self.phase_times)}
+
 
 ############################## Search Algorithms #############################
 
 # implement best-first-search template
 # see https://aima.cs.berkeley.edu/figures.pdf#page=11
-def expand(problem, node):
-    s = node.state
-    for action in problem.actions(s):
-        s1 = problem.result(s, action)
-        cost = node.path_cost + problem.action_cost(s, action, s1)
-        yield Node(s1, node, action, cost)
+def successor_triples(problem, s):
+    # (action, child_state, step_cost) for every action in s. Problems that provide successors(state)
+    # generate them all at once; otherwise they come from actions / result / action_cost
+    successors = getattr(problem, 'successors', None)
+    if successors is not None:
+        return successors(s)
+    return ((action, s1, problem.action_cost(s, action, s1))
+            for action, s1 in ((action, problem.result(s, action)) for action in problem.actions(s)))
+
+def expand(problem, node, f=None):
+    for action, s1, step_cost in successor_triples(problem, node.state):
+        child = node.child(s1, action, node.path_cost + step_cost)
+        if f is not None:
+            child.f = f(child)
+        yield child
         
-def best_first_search(problem, f):
-    node = Node(problem.initial_state)
-    frontier = PriorityQueue([node], priority_function=f)
+# priority of a node whose f was already computed by expand
+cached_f = (lambda node: node.f)
+
+"""
+Graph-like best-first search. With fast_expand=True (the default) successors are read as
+(action, state, cost) triples and a child node is only created (and f only evaluated) when the child
+improves on reached; fast_expand=False materializes every child through expand first.
+"""
+def best_first_search(problem, f, node_factory=Node, stats=None, fast_expand=True):
+    if isinstance(node_factory, SearchTree):
+        return best_first_search_tree(problem, f, node_factory, stats=stats)
+    if stats is not None:
+        stats.start_phase('setup')
+    node = node_factory(problem.initial_state)
+    node.f = f(node)
+    # frontier holds at most one node per state: a cheaper path to a queued state replaces its entry
+    frontier = IndexedPriorityQueue([node], priority_function=cached_f, key_function=(lambda n: n.state))
     reached = {problem.initial_state: node}
+    if stats is not None:
+        stats.pushed(1, 1)
+        stats.start_phase('search')
     while len(frontier) > 0:
         node = frontier.pop()
+        if stats is not None:
+            stats.nodes_popped += 1
         if problem.is_goal(node.state):
+            if stats is not None:
+                stats.end_phase()
             return node
-        for child in expand(problem, node):
+        if fast_expand:
+            path_cost = node.path_cost
+            triples = successor_triples(problem, node.state)
+            if stats is not None:
+                triples = list(triples)
+                stats.nodes_generated += len(triples)
+            for action, s, step_cost in triples:
+                cost = path_cost + step_cost
+                old = reached.get(s)
+                if old is not None and cost >= old.path_cost:
+                    continue # no node is created for children that do not improve on reached
+                child = node.child(s, action, cost)
+                child.f = f(child)
+                reopened = stats is not None and old is not None and s not in frontier
+                reached[s] = child
+                frontier.add(child)
+                if stats is not None:
+                    # after add: re-adding a queued state replaces its entry, so the frontier may not grow
+                    stats.nodes_allocated += 1
+                    stats.pushed(len(frontier), len(reached), reopened=reopened)
+            continue
+        for child in expand(problem, node, f):
             s = child.state
+            if stats is not None:
+                stats.nodes_generated += 1
+                stats.nodes_allocated += 1
             if s not in reached or child.path_cost < reached[s].path_cost:
+                reopened = stats is not None and s in reached and s not in frontier
                 reached[s] = child
                 frontier.add(child)
+                if stats is not None:
+                    stats.pushed(len(frontier), len(reached), reopened=reopened)
+    if stats is not None:
+        stats.end_phase()
     return None
 
-def best_first_search_treelike(problem, f):
-    node = Node(problem.initial_state)
-    frontier = PriorityQueue([node], priority_function=f)
+"""
+Tree-like best-first search (no reached table). Optional duplicate pruning:
+check_cycles=True skips children whose state repeats an ancestor on their own path (the ancestor set
+is kept incrementally across expansions), and table_size=n keeps a bounded TranspositionTable of the
+n most recent states and prunes children already generated at no higher cost.
+"""
+def best_first_search_treelike(problem, f, node_factory=Node, check_cycles=False, table_size=None, stats=None):
+    if isinstance(node_factory, SearchTree):
+        return best_first_search_tree(problem, f, node_factory, treelike=True,
+                                      check_cycles=check_cycles, table_size=table_size, stats=stats)
+    if stats is not None:
+        stats.start_phase('setup')
+    node = node_factory(problem.initial_state)
+    node.f = f(node)
+    frontier = PriorityQueue([node], priority_function=cached_f)
+    ancestors = AncestorSet() if check_cycles else None
+    table = TranspositionTable(table_size) if table_size else None
+    if table is not None:
+        table.admit(node.state, node.path_cost)
+    if stats is not None:
+        stats.pushed(1)
+        stats.start_phase('search')
     while len(frontier) > 0:
         node = frontier.pop()
+        if stats is not None:
+            stats.nodes_popped += 1
         if problem.is_goal(node.state):
+            if stats is not None:
+                stats.end_phase()
             return node
-        for child in expand(problem, node):
+        if ancestors is not None:
+            ancestors.move_to(node)
+        for child in expand(problem, node, f):
+            if stats is not None:
+                stats.nodes_generated += 1
+                stats.nodes_allocated += 1
+            if ancestors is not None and child.state in ancestors:
+                continue
+            if table is not None and not table.admit(child.state, child.path_cost):
+                continue
             frontier.add(child)
+            if stats is not None:
+                stats.pushed(len(frontier))
+    if stats is not None:
+        stats.end_phase()
+    return None
+
+"""
+best_first_search (or its treelike sibling) on a SearchTree: the frontier and reached hold node ids,
+and a child gets a row in the tree only once it is accepted into the frontier.
+Ties in f are broken by state, as with Node.
+"""
+def best_first_search_tree(problem, f, tree, treelike=False, check_cycles=False, table_size=None, stats=None):
+    if stats is not None:
+        stats.start_phase('setup')
+    states = tree.states
+    node_f = (lambda node_id: f(TreeNode(tree, node_id)))
+    root_id = tree.add(problem.initial_state, -1, 0, 0)
+    if treelike:
+        frontier = PriorityQueue([root_id], priority_function=(lambda node_id: (node_f(node_id), states[node_id])))
+    else:
+        frontier = IndexedPriorityQueue([root_id], priority_function=node_f, key_function=states.__getitem__)
+    reached = None if treelike else {problem.initial_state: root_id}
+    ancestors = None
+    if check_cycles:
+        ancestors = AncestorSet(parent_of=(lambda i: None if tree.parents[i] < 0 else tree.parents[i]),
+                                depth_of=tree.depths.__getitem__, state_of=states.__getitem__)
+    table = TranspositionTable(table_size) if table_size else None
+    if table is not None:
+        table.admit(problem.initial_state, 0)
+    if stats is not None:
+        stats.pushed(1, 0 if treelike else 1)
+        stats.start_phase('search')
+    while len(frontier) > 0:
+        node_id = frontier.pop()
+        if stats is not None:
+            stats.nodes_popped += 1
+        s = states[node_id]
+        if problem.is_goal(s):
+            if stats is not None:
+                stats.end_phase()
+            return TreeNode(tree, node_id)
+        if ancestors is not None:
+            ancestors.move_to(node_id)
+        path_cost = tree.path_costs[node_id]
+        for action, s1, step_cost in successor_triples(problem, s):
+            cost = path_cost + step_cost
+            if stats is not None:
+                stats.nodes_generated += 1
+            if not treelike:
+                old_id = reached.get(s1)
+                if old_id is not None and cost >= tree.path_costs[old_id]:
+                    continue
+            else:
+                if ancestors is not None and s1 in ancestors:
+                    continue
+                if table is not None and not table.admit(s1, cost):
+                    continue
+            reopened = stats is not None and not treelike and s1 in reached and s1 not in frontier
+            child_id = tree.add(s1, node_id, tree.action_table.intern(action), cost)
+            if not treelike:
+                reached[s1] = child_id
+            frontier.add(child_id)
+            if stats is not None:
+                stats.nodes_allocated += 1
+                stats.pushed(len(frontier), 0 if treelike else len(reached), reopened=reopened)
+    if stats is not None:
+        stats.end_phase()
     return None
     
 
 
+def expand_backward(problem, node, f=None):
+    # children of node are its predecessor states; child.action_from_parent leads from child to node
+    for action, s0, step_cost in problem.predecessors(node.state):
+        child = node.child(s0, action, node.path_cost + step_cost)
+        if f is not None:
+            child.f = f(child)
+        yield child
+
+def join_paths(forward_node, backward_node):
+    # extend the forward path with the states of the backward path (backward_node back to its goal root)
+    node = forward_node
+    while backward_node.parent_node is not None:
+        parent = backward_node.parent_node
+        step_cost = backward_node.path_cost - parent.path_cost
+        node = node.child(parent.state, backward_node.action_from_parent, node.path_cost + step_cost)
+        backward_node = parent
+    return node
+
+"""
+Bidirectional search: grows a frontier forward from the initial state and one backward from the goal
+states, and joins them where they meet. The problem must also provide goal_states() (all goal states)
+and predecessors(state) (yields (action, previous_state, cost)); problems that set them to None are rejected.
+The goal states form an implicit layer at cost 0: forward children are goal-tested directly, goal states
+are drawn lazily from goal_states() only when the backward side expands them, and predecessors that are
+goal states themselves are skipped. The side that has expanded fewer nodes so far is expanded next.
+strategy='bfs' minimizes the number of actions, strategy='ucs' the path cost.
+"""
+def bidirectional_search(problem, strategy='ucs', node_factory=Node):
+    if strategy == 'bfs':
+        g = (lambda node: node.depth)
+    elif strategy == 'ucs':
+        g = (lambda node: node.path_cost)
+    else:
+        raise ValueError('unknown strategy {!r}; expected \'bfs\' or \'ucs\''.format(strategy))
+    if getattr(problem, 'goal_states', None) is None or getattr(problem, 'predecessors', None) is None:
+        raise ValueError('{} does not support backward search (no goal_states/predecessors)'.format(
+                         type(problem).__name__))
+    state_key = (lambda n: n.state)
+    
+    node = node_factory(problem.initial_state)
+    node.f = g(node)
+    if problem.is_goal(node.state):
+        return node
+    frontier_f = IndexedPriorityQueue([node], priority_function=cached_f, key_function=state_key)
+    reached_f = {problem.initial_state: node}
+    frontier_b = IndexedPriorityQueue(priority_function=cached_f, key_function=state_key)
+    reached_b = {}
+    goals = iter(problem.goal_states())
+    next_goal = next(goals, None) # next goal state to expand backward (None once the goal layer is done)
+    expanded_f, expanded_b = 0, 0
+    
+    best_cost, best_pair = None, None
+    while len(frontier_f) > 0:
+        # min g on the backward side: 0 while goal states remain to be expanded
+        if next_goal is not None:
+            top_b = 0
+        else:
+            top_b = frontier_b.peek().f if len(frontier_b) > 0 else float('inf')
+        # no unexpanded pair of nodes can join into a path cheaper than the best one found
+        if best_pair is not None and frontier_f.peek().f + top_b >= best_cost:
+            break
+        if expanded_b < expanded_f and top_b != float('inf'):
+            expanded_b += 1
+            if next_goal is not None:
+                node = node_factory(next_goal)
+                node.f = g(node)
+                next_goal = next(goals, None)
+            else:
+                node = frontier_b.pop()
+            children, frontier, reached, other = expand_backward(problem, node, g), frontier_b, reached_b, reached_f
+        else:
+            expanded_f += 1
+            node = frontier_f.pop()
+            children, frontier, reached, other = expand(problem, node, g), frontier_f, reached_f, reached_b
+        for child in children:
+            s = child.state
+            if problem.is_goal(s):
+                # forward: reached the goal layer; backward: a goal state is already in the goal layer
+                if frontier is frontier_f and (best_pair is None or child.f < best_cost):
+                    best_cost, best_pair = child.f, (child, None)
+                continue
+            if s not in reached or child.f < reached[s].f:
+                reached[s] = child
+                frontier.add(child)
+                if s in other and (best_pair is None or child.f + other[s].f < best_cost):
+                    best_cost = child.f + other[s].f
+                    best_pair = (child, other[s]) if frontier is frontier_f else (other[s], child)
+    if best_pair is None:
+        return None
+    forward_node, backward_node = best_pair
+    if backward_node is None:
+        return forward_node
+    return join_paths(forward_node, backward_node)
+
+"""
+Iterative-deepening A*: repeated depth-first searches bounded by f = path_cost + h, each time raising
+the bound to the smallest f that exceeded it. Memory is O(depth): only the current path is stored,
+and states already on the current path are not revisited. (With a SearchTree as node_factory every
+generated node gets a row in the tree, so memory is no longer O(depth).)
+If iterations is a list, one (f_bound, nodes_generated) pair is appended per iteration.
+"""
+def ida_star_search(problem, h, iterations=None, node_factory=Node):
+    astar_f = (lambda node: node.path_cost + h(node))
+    root = node_factory(problem.initial_state)
+    root.f = astar_f(root)
+    if problem.is_goal(root.state):
+        return root
+    bound = root.f
+    while True:
+        generated = 0
+        next_bound = float('inf')
+        found = None
+        path_states = {root.state}
+        stack = [(root, expand(problem, root, astar_f))]
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None: # all children tried: backtrack
+                del stack[-1]
+                path_states.discard(node.state)
+                continue
+            generated += 1
+            if child.state in path_states:
+                continue
+            if child.f > bound:
+                next_bound = min(next_bound, child.f)
+                continue
+            if problem.is_goal(child.state):
+                found = child
+                break
+            path_states.add(child.state)
+            stack.append((child, expand(problem, child, astar_f)))
+        if iterations is not None:
+            iterations.append((bound, generated))
+        if found is not None or next_bound == float('inf'):
+            return found
+        bound = next_bound
+
+"""
+Recursive best-first search (see https://aima.cs.berkeley.edu/figures.pdf#page=13): best-first search in
+O(depth) memory, backing up the best f-value of forgotten subtrees. The recursion is run on an explicit
+stack, so solution depth is not limited by Python's recursion limit. States already on the current path
+are not revisited. On problems with many f-ties (e.g. unit costs with a weak h) RBFS keeps switching
+between subtrees and regenerates them; ida_star_search is usually faster there.
+Each time the search returns to the root and descends into its best child again is one iteration:
+if iterations is a list, one (f_value_of_that_child, nodes_generated) pair is appended per iteration.
+"""
+def recursive_best_first_search(problem, h, iterations=None, node_factory=Node):
+    astar_f = (lambda node: node.path_cost + h(node))
+    root = node_factory(problem.initial_state)
+    root.f = astar_f(root)
+    generated = 0
+    iteration = None # (f_value, nodes generated before it started) of the current root-level descent
+    path_states = set()
+    stack = [] # frames [node, successors sorted by f, f_limit]; successors[0] is the child being explored
+    found = None
+    descend = (root, float('inf'))
+    backed_up = None # f-value backed up from the frame just left, for its parent's current child
+    while True:
+        if descend is not None:
+            node, f_limit = descend
+            descend = None
+            if problem.is_goal(node.state):
+                found = node
+                break
+            successors = list(expand(problem, node, astar_f))
+            generated += len(successors)
+            successors = [child for child in successors if child.state not in path_states]
+            if successors:
+                for child in successors:
+                    child.f = max(child.f, node.f)
+                path_states.add(node.state)
+                stack.append([node, successors, f_limit])
+            else:
+                backed_up = float('inf')
+        if not stack:
+            break
+        node, successors, f_limit = stack[-1]
+        if backed_up is not None:
+            successors[0].f = backed_up
+            backed_up = None
+        successors.sort(key=cached_f)
+        best = successors[0]
+        if best.f > f_limit or best.f == float('inf'): # give up this subtree, back up its best f
+            del stack[-1]
+            path_states.discard(node.state)
+            backed_up = best.f
+            continue
+        if len(stack) == 1 and iterations is not None: # (re-)descending from the root
+            if iteration is not None:
+                iterations.append((iteration[0], generated - iteration[1]))
+            iteration = (best.f, generated)
+        alternative = successors[1].f if len(successors) > 1 else float('inf')
+        descend = (best, min(f_limit, alternative))
+    if iteration is not None:
+        iterations.append((iteration[0], generated - iteration[1]))
+    return found
+
+"""
+Anytime weighted A* (ARA*, Likhachev et al. 2003): a generator yielding (goal_node, bound) each time
+a cheaper solution is found, where goal_node.path_cost <= bound * optimal cost. The first pass runs
+weighted A* with f = path_cost + weight * h, which finds a solution quickly. Each later pass lowers the
+weight by weight_step (down to 1) and re-uses the work done so far: states improved after they were
+expanded in the current pass are kept aside (INCONS) and re-queued for the next pass instead of
+being expanded again. The last solution has bound 1 (optimal, for an admissible h) unless the search
+is cut short by time_limit (seconds) or max_nodes (expansions), after which the generator just stops.
+    for goal_node, bound in anytime_astar_search(problem, h=problem.h, time_limit=0.5): ...
+"""
+def anytime_astar_search(problem, h, weight=3.0, weight_step=0.5, time_limit=None, max_nodes=None,
+                         h_cache_size=1 << 20, node_factory=Node):
+    h = cached_heuristic(h, h_cache_size)
+    deadline = None if time_limit is None else perf_counter() + time_limit
+    root = node_factory(problem.initial_state)
+    if problem.is_goal(root.state):
+        yield root, 1.0
+        return
+    weighted_f = (lambda node: node.path_cost + weight * h(node))
+    reached = {root.state: root} # best node found so far per state
+    frontier = IndexedPriorityQueue([root], priority_function=weighted_f, key_function=(lambda n: n.state))
+    incons = {}
+    incumbent = None
+    last_yield = None
+    expanded = 0
+    while True:
+        # improve the incumbent until no queued node can beat it under the current weight
+        closed = set()
+        while len(frontier) > 0 and (incumbent is None or incumbent.path_cost > frontier.pqueue[0][0]):
+            if (max_nodes is not None and expanded >= max_nodes) or (deadline is not None and perf_counter() > deadline):
+                return
+            node = frontier.pop()
+            closed.add(node.state)
+            expanded += 1
+            for child in expand(problem, node):
+                s = child.state
+                if s in reached and child.path_cost >= reached[s].path_cost:
+                    continue
+                reached[s] = child
+                if problem.is_goal(s):
+                    if incumbent is None or child.path_cost < incumbent.path_cost:
+                        incumbent = child
+                elif s in closed:
+                    incons[s] = child
+                else:
+                    frontier.add(child)
+        if incumbent is None: # no solution
+            return
+        # bound: the optimal cost is at least the smallest g + h of any state not yet fully settled
+        lower = min((n.path_cost + h(n) for n in list(incons.values()) + [item for _, _, item in frontier.pqueue]),
+                    default=incumbent.path_cost)
+        bound = min(weight, incumbent.path_cost / lower) if lower > 0 else weight
+        bound = max(bound, 1.0)
+        if last_yield is None or incumbent is not last_yield[0] or bound < last_yield[1]:
+            last_yield = (incumbent, bound)
+            yield incumbent, bound
+        if weight <= 1 or bound <= 1:
+            return
+        weight = max(1.0, weight - weight_step)
+        # next pass: re-queue INCONS and re-prioritize everything under the new weight
+        frontier = IndexedPriorityQueue(list(incons.values()) + [item for _, _, item in frontier.pqueue],
+                                        priority_function=weighted_f, key_function=(lambda n: n.state))
+        incons = {}
+
+def write_merged_runs(runs, layer_paths, block_size=1 << 16):
+    # k-way merge of sorted (states, parents, action_ids) runs; a state in several runs keeps its
+    # first occurrence (earliest run), like the in-chunk deduplication. Runs must not be empty (np.memmap
+    # rejects empty files); with no runs the layer files are written empty.
+    def entries(run_paths):
+        run_states, run_parents, run_actions = (np.memmap(path, dtype=dtype, mode='r')
+                                                for path, dtype in zip(run_paths, (np.uint64, np.int64, np.uint8)))
+        for start in range(0, len(run_states), block_size):
+            stop = start + block_size
+            yield from zip(run_states[start:stop].tolist(), run_parents[start:stop].tolist(),
+                           run_actions[start:stop].tolist())
+    count = 0
+    previous = None
+    buffers = ([], [], [])
+    files = [open(path, 'wb') for path in layer_paths]
+    try:
+        for state, parent, action_id in heapq.merge(*(entries(run) for run in runs), key=(lambda entry: entry[0])):
+            if state == previous:
+                continue
+            previous = state
+            for buffer, value in zip(buffers, (state, parent, action_id)):
+                buffer.append(value)
+            count += 1
+            if len(buffers[0]) >= block_size:
+                for f, buffer, dtype in zip(files, buffers, (np.uint64, np.int64, np.uint8)):
+                    np.array(buffer, dtype=dtype).tofile(f)
+                    buffer.clear()
+        for f, buffer, dtype in zip(files, buffers, (np.uint64, np.int64, np.uint8)):
+            np.array(buffer, dtype=dtype).tofile(f)
+    finally:
+        for f in files:
+            f.close()
+    return count
+
+"""
+External-memory breadth-first search for problems with packed int states (below 2**64). Each BFS layer
+is kept on disk in work_dir as three flat files read through np.memmap: the layer's states sorted
+as uint64, the index of each state's parent in the previous layer, and the id of the action from the
+parent. A layer is built chunk by chunk (chunk_size states of the previous layer at a time, expanded
+with problem.expand_batch when available): each chunk's children are sorted and deduplicated, and
+children already in an earlier layer are dropped by binary search in those sorted files (all earlier
+layers, since the state graph is directed). The sorted chunk runs are then merged into the new layer.
+Only one chunk and the merge heads are held in memory. The first goal generated ends the search, and
+its path is rebuilt by following the parent files back to layer 0.
+If layers is a list, the size of each layer is appended to it. work_dir=None uses a temporary
+directory that is removed afterwards.
+"""
+def external_breadth_first_search(problem, work_dir=None, chunk_size=1 << 16, layers=None):
+    if not getattr(problem, 'packed', False):
+        raise ValueError('external_breadth_first_search needs a problem with packed int states (packed=True)')
+    if problem.alive_shift + len(problem.monster_coords) > 64:
+        raise ValueError('packed states do not fit in 64 bits')
+    if problem.is_goal(problem.initial_state):
+        return Node(problem.initial_state)
+    temp_dir = work_dir is None
+    work_dir = tempfile.mkdtemp(prefix='external_bfs_') if temp_dir else work_dir
+    os.makedirs(work_dir, exist_ok=True)
+    layer_paths = (lambda depth: [os.path.join(work_dir, 'layer{}.{}'.format(depth, kind))
+                                  for kind in ('states', 'parents', 'actions')])
+    open_layer = (lambda depth: [np.memmap(path, dtype=dtype, mode='r') if os.path.getsize(path) else np.zeros(0, dtype)
+                                 for path, dtype in zip(layer_paths(depth), (np.uint64, np.int64, np.uint8))])
+    action_table = ActionTable()
+    try:
+        np.array([problem.initial_state], dtype=np.uint64).tofile(layer_paths(0)[0])
+        np.array([-1], dtype=np.int64).tofile(layer_paths(0)[1])
+        np.array([0], dtype=np.uint8).tofile(layer_paths(0)[2])
+        previous_layers = [open_layer(0)[0]]
+        if layers is not None:
+            layers.append(1)
+        goal = None
+        depth = 0
+        while goal is None and len(previous_layers[-1]) > 0:
+            frontier = previous_layers[-1]
+            runs = []
+            for start in range(0, len(frontier), chunk_size):
+                parents = frontier[start:start + chunk_size].tolist()
+                if hasattr(problem, 'expand_batch'):
+                    batch = problem.expand_batch(parents)
+                else:
+                    batch = [successor_triples(problem, state) for state in parents]
+                children, parent_ids, action_ids = [], [], []
+                for offset, triples in enumerate(batch):
+                    for action, child, _ in triples:
+                        if problem.is_goal(child):
+                            goal = (start + offset, action, child)
+                            break
+                        children.append(child)
+                        parent_ids.append(start + offset)
+                        action_ids.append(action_table.intern(action))
+                    if goal is not None:
+                        break
+                if goal is not None:
+                    break
+                if len(action_table) > 256:
+                    raise ValueError('more than 256 distinct actions; action ids are stored as bytes')
+                children = np.array(children, dtype=np.uint64)
+                # sort and keep the first parent of each state
+                children, first = np.unique(children, return_index=True)
+                keep = np.ones(len(children), dtype=bool)
+                for layer in previous_layers:
+                    if len(layer):
+                        slots = np.minimum(np.searchsorted(layer, children), len(layer) - 1)
+                        keep &= layer[slots] != children
+                if not keep.any(): # no new states in this chunk; empty files cannot be memmapped
+                    continue
+                run = [os.path.join(work_dir, 'run{}.{}'.format(len(runs), kind)) for kind in ('states', 'parents', 'actions')]
+                children[keep].tofile(run[0])
+                np.array(parent_ids, dtype=np.int64)[first][keep].tofile(run[1])
+                np.array(action_ids, dtype=np.uint8)[first][keep].tofile(run[2])
+                runs.append(run)
+            if goal is None:
+                size = write_merged_runs(runs, layer_paths(depth + 1))
+                for run in runs:
+                    for path in run:
+                        os.remove(path)
+                depth += 1
+                previous_layers.append(open_layer(depth)[0])
+                if layers is not None:
+                    layers.append(size)
+        if goal is None:
+            return None
+        # rebuild the path: goal's parent is in layer depth, then follow the parent files back
+        parent_index, action, state = goal
+        steps = [(action, state)]
+        for d in range(depth, 0, -1):
+            states, parents, actions = open_layer(d)
+            steps.append((action_table[int(actions[parent_index])], int(states[parent_index])))
+            parent_index = int(parents[parent_index])
+        steps.reverse()
+        node = Node(problem.initial_state)
+        for action, state in steps:
+            node = node.child(state, action, node.path_cost + problem.action_cost(node.state, action, state))
+        return node
+    finally:
+        previous_layers = None
+        if temp_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+"""
+iterate over the nodes on the path to node. With reverse=True the nodes are streamed lazily from
+node back to the root. Root-first order (the default) is not lazy: the parent chain is walked once
+up front into a list of O(depth) node references, which are then yielded in order.
+"""
+def iter_path(node, reverse=False):
+    if reverse:
+        while node is not None:
+            yield node
+            node = node.parent_node
+    else:
+        chain = list(iter_path(node, reverse=True))
+        for i in range(len(chain) - 1, -1, -1):
+            yield chain[i]
+
 def get_path_actions(node):
-    if node is None or node.parent_node is None:
-        return []
-    return get_path_actions(node.parent_node) + [node.action_from_parent]
+    actions = [n.action_from_parent for n in iter_path(node, reverse=True) if n.parent_node is not None]
+    actions.reverse()
+    return actions
 
 def get_path_states(node):
-    if node is None: 
-        return []
-    return get_path_states(node.parent_node) + [node.state]
+    states = [n.state for n in iter_path(node, reverse=True)]
+    states.reverse()
+    return states
+
+"""
+encode the actions on the path to node as one byte per action (ids from action_table, which
+is extended with any new action). Use decode_path_actions with the same table to read it back.
+"""
+def encode_path_actions(node, action_table):
+    action_ids = array('B')
+    for action in get_path_actions(node):
+        action_id = action_table.ids.get(action)
+        if action_id is None:
+            # check before interning, so a failed encode leaves the table within the byte limit
+            if len(action_table) > 255:
+                raise ValueError('action table already has 256 actions; path cannot be byte-encoded')
+            action_id = action_table.intern(action)
+        action_ids.append(action_id)
+    return action_ids.tobytes()
+
+def decode_path_actions(data, action_table):
+    return [action_table[action_id] for action_id in data]
     
-def breadth_first_search(problem, treelike=False):
+"""
+The search wrappers below pass any extra keyword options on to best_first_search or
+best_first_search_treelike (e.g. check_cycles=True, table_size=100000 for treelike searches).
+"""
+def breadth_first_search(problem, treelike=False, node_factory=Node, **options):
     bfs_f = (lambda node: node.depth)
     if treelike:
-        return best_first_search_treelike(problem, f=bfs_f)
+        return best_first_search_treelike(problem, f=bfs_f, node_factory=node_factory, **options)
     else:
-        return best_first_search(problem, f=bfs_f)
+        return best_first_search(problem, f=bfs_f, node_factory=node_factory, **options)
 
-def depth_first_search(problem, treelike=False):
+def depth_first_search(problem, treelike=False, node_factory=Node, **options):
     dfs_f = (lambda node: -node.depth)
     if treelike:
-        return best_first_search_treelike(problem, f=dfs_f)
+        return best_first_search_treelike(problem, f=dfs_f, node_factory=node_factory, **options)
     else:
-        return best_first_search(problem, f=dfs_f)
+        return best_first_search(problem, f=dfs_f, node_factory=node_factory, **options)
 
-def uniform_cost_search(problem, treelike=False):
+def uniform_cost_search(problem, treelike=False, node_factory=Node, **options):
     ucs_f = (lambda node: node.path_cost)
     if treelike:
-        return best_first_search_treelike(problem, f=ucs_f)
+        return best_first_search_treelike(problem, f=ucs_f, node_factory=node_factory, **options)
     else:
-        return best_first_search(problem, f=ucs_f)
+        return best_first_search(problem, f=ucs_f, node_factory=node_factory, **options)
 
-def greedy_search(problem, h, treelike=False):
+def greedy_search(problem, h, treelike=False, h_cache_size=1 << 20, node_factory=Node, **options):
+    h = cached_heuristic(h, h_cache_size)
     if treelike:
-        return best_first_search_treelike(problem, f=h)
+        return best_first_search_treelike(problem, f=h, node_factory=node_factory, **options)
     else:
-        return best_first_search(problem, f=h)
+        return best_first_search(problem, f=h, node_factory=node_factory, **options)
 
-def astar_search(problem, h, treelike=False):
+def astar_search(problem, h, treelike=False, h_cache_size=1 << 20, node_factory=Node, **options):
+    h = cached_heuristic(h, h_cache_size)
     if treelike:
-        return best_first_search_treelike(problem, f=(lambda node: node.path_cost + h(node)))
+        return best_first_search_treelike(problem, f=(lambda node: node.path_cost + h(node)), node_factory=node_factory, **options)
     else:
-        return best_first_search(problem, f=(lambda node: node.path_cost + h(node)))
\ No newline at end of file
+        return best_first_search(problem, f=(lambda node: node.path_cost + h(node)), node_factory=node_factory, **options)
+
+############################## Parallel Runners #############################
+
+"""
+Portfolio strategies by name. Each takes (problem, **options) and returns a goal node or None.
+They are module-level functions so they can be sent to worker processes (lambdas cannot be pickled).
+OPTIMAL_STRATEGIES lists the ones whose first solution is always optimal. The h-based strategies are left
+out since their optimality depends on problem.h being admissible, which GridHunterProblem.h is not.
+"""
+def astar_h_search(problem, **options):
+    return astar_search(problem, h=problem.h, **options)
+
+def greedy_h_search(problem, **options):
+    return greedy_search(problem, h=problem.h, **options)
+
+def ida_star_h_search(problem, **options):
+    return ida_star_search(problem, h=problem.h, **options)
+
+PORTFOLIO_STRATEGIES = {
+    'bfs': breadth_first_search,
+    'dfs': depth_first_search,
+    'ucs': uniform_cost_search,
+    'greedy': greedy_h_search,
+    'astar': astar_h_search,
+    'bidirectional': bidirectional_search,
+    'ida_star': ida_star_h_search,
+}
+OPTIMAL_STRATEGIES = {'ucs', 'bidirectional'}
+
+"""
+Goal nodes are sent back from workers as a flat list of (state, action, path_cost) steps and rebuilt
+into a Node chain, since pickling a deep parent chain directly is recursive.
+"""
+def node_to_steps(node):
+    if node is None:
+        return None
+    return [(n.state, n.action_from_parent, n.path_cost) for n in iter_path(node)]
+
+def steps_to_node(steps):
+    if steps is None:
+        return None
+    node = None
+    for state, action, path_cost in steps:
+        node = Node(state, node, action, path_cost)
+    return node
+
+def strategy_name(strategy):
+    return strategy if isinstance(strategy, str) else strategy.__name__
+
+def run_strategy(problem, strategy, options):
+    search_algo = PORTFOLIO_STRATEGIES[strategy] if isinstance(strategy, str) else strategy
+    return node_to_steps(search_algo(problem, **options))
+
+def portfolio_worker(problem, strategy, options, index, results):
+    try:
+        results.put((index, run_strategy(problem, strategy, options), None))
+    except Exception as e:
+        results.put((index, None, repr(e)))
+
+"""
+run several strategies on the same (picklable) problem in parallel, one process each, and return
+(strategy name, goal node) for the first acceptable solution; the remaining processes are terminated.
+    strategies: names from PORTFOLIO_STRATEGIES, or module-level functions taking (problem, **options)
+    accept(name, node): whether a solution can be returned right away. The default accepts solutions
+        from OPTIMAL_STRATEGIES. If no solution is accepted, the cheapest one found is returned.
+    options: per-strategy keyword options, {strategy name: dict}
+    timeout: seconds to wait overall; strategies still running by then are terminated
+    failures: optional dict, filled with {strategy name: error} for strategies that raised. A failing
+        strategy does not stop the others.
+Returns (None, None) if no strategy finds a solution.
+Running searches cannot be cancelled through a ProcessPoolExecutor (Future.cancel only drops queued
+work), so each strategy gets its own Process which can be terminated once a winner is known.
+"""
+def portfolio_search(problem, strategies=('ucs', 'astar', 'bfs'), accept=None, options=None,
+                     max_workers=None, timeout=None, failures=None):
+    if accept is None:
+        accept = (lambda name, node: name in OPTIMAL_STRATEGIES)
+    options = options or {}
+    names = [strategy_name(strategy) for strategy in strategies]
+    max_workers = max_workers or min(len(strategies), mp.cpu_count())
+    deadline = None if timeout is None else perf_counter() + timeout
+    results = mp.Queue()
+    pending = list(range(len(strategies)))
+    running = {}
+    best = (None, None)
+    try:
+        while pending or running:
+            while pending and len(running) < max_workers:
+                index = pending.pop(0)
+                process = mp.Process(target=portfolio_worker, daemon=True,
+                                     args=(problem, strategies[index], options.get(names[index], {}), index, results))
+                process.start()
+                running[index] = process
+            wait = None if deadline is None else max(0.0, deadline - perf_counter())
+            try:
+                index, steps, error = results.get(timeout=wait)
+            except queue.Empty: # out of time
+                break
+            running.pop(index).join()
+            if error is not None:
+                if failures is not None:
+                    failures[names[index]] = error
+                continue
+            node = steps_to_node(steps)
+            if node is None:
+                continue
+            if accept(names[index], node):
+                return names[index], node
+            if best[1] is None or node.path_cost < best[1].path_cost:
+                best = (names[index], node)
+    finally:
+        for process in running.values():
+            process.terminate()
+            process.join()
+    return best
+
+def solve_one(args):
+    problem, strategy, options = args
+    return run_strategy(problem, strategy, options)
+
+"""
+solve many independent problems with one strategy across a process pool. Returns the goal nodes
+(None where there is no solution) in the order of problems.
+"""
+def solve_many(problems, strategy='astar', max_workers=None, chunksize=1, **options):
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return [steps_to_node(steps) for steps in
+                executor.map(solve_one, [(problem, strategy, options) for problem in problems], chunksize=chunksize)]
+
+
+"""
+Hash-distributed A* (HDA*). Every state has an owner process, picked by state_owner; each of the
+workers keeps the open list and best-g table for the states it owns and sends generated states it
+does not own to their owners in batches, as (state, g, actions from the root) messages.
+    incumbent: shared cost of the best solution so far. Workers prune nodes with f >= incumbent, so
+        with an admissible h the last incumbent is optimal once everything has been pruned or expanded.
+    termination: a worker marks itself idle only after flushing its outgoing batches, when it has
+        nothing left below the incumbent. The parent stops the workers once two snapshots taken 10ms apart
+        see every worker idle and the same sent == received message counts.
+The solution path is rebuilt in the parent by replaying its actions from the initial state. If
+expansions is a list, the number of nodes expanded by each worker is appended to it.
+"""
+def state_owner(state, workers):
+    if isinstance(state, int):
+        # packed states: mix the bits first (the low bits only hold mstep and direction)
+        return (((state * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> 32) % workers
+    # not hash(): str hashes are salted per process
+    return zlib.crc32(repr(state).encode()) % workers
+
+def hda_star_worker(problem, h, index, inboxes, results, incumbent, idle, sent, received, stop, batch_size):
+    workers = len(inboxes)
+    inbox = inboxes[index]
+    best_g = {}
+    open_list = []
+    counter = 0
+    outboxes = [[] for _ in range(workers)]
+    expanded = 0
+    for other in inboxes:
+        other.cancel_join_thread() # batches left unread at stop must not block this process from exiting
+
+    def flush():
+        for owner, batch in enumerate(outboxes):
+            if batch:
+                with sent.get_lock():
+                    sent.value += 1
+                inboxes[owner].put(batch)
+                outboxes[owner] = []
+
+    def push(state, g, path):
+        nonlocal counter
+        if g < best_g.get(state, float('inf')):
+            f = g + h(Node(state))
+            if f < incumbent.value:
+                best_g[state] = g
+                counter += 1
+                heapq.heappush(open_list, (f, g, counter, state, path))
+
+    while not stop.is_set():
+        try:
+            batch = inbox.get_nowait() if open_list and open_list[0][0] < incumbent.value else inbox.get(timeout=0.01)
+        except queue.Empty:
+            batch = None
+        if batch is not None:
+            idle[index] = 0
+            for state, g, path in batch:
+                push(state, g, path)
+            with received.get_lock():
+                received.value += 1
+        if not open_list or open_list[0][0] >= incumbent.value:
+            open_list = [] # everything left is pruned by the incumbent
+            flush()
+            if batch is None:
+                idle[index] = 1
+            continue
+        f, g, _, state, path = heapq.heappop(open_list)
+        if g > best_g.get(state, float('inf')):
+            continue # stale entry: a cheaper path was pushed later
+        if problem.is_goal(state):
+            with incumbent.get_lock():
+                if g < incumbent.value:
+                    incumbent.value = g
+                    results.put(('solution', g, path))
+            continue
+        expanded += 1
+        for action, s1, step_cost in successor_triples(problem, state):
+            owner = state_owner(s1, workers)
+            if owner == index:
+                push(s1, g + step_cost, path + (action,))
+            else:
+                outboxes[owner].append((s1, g + step_cost, path + (action,)))
+                if len(outboxes[owner]) >= batch_size:
+                    with sent.get_lock():
+                        sent.value += 1
+                    inboxes[owner].put(outboxes[owner])
+                    outboxes[owner] = []
+    results.put(('expanded', index, expanded))
+
+def hda_star_search(problem, h, workers=None, batch_size=64, expansions=None):
+    workers = workers or mp.cpu_count()
+    inboxes = [mp.Queue() for _ in range(workers)]
+    results = mp.Queue()
+    incumbent = mp.Value('d', float('inf'))
+    idle = mp.Array('b', [0] * workers, lock=False)
+    sent, received = mp.Value('q', 1), mp.Value('q', 0)
+    stop = mp.Event()
+    inboxes[state_owner(problem.initial_state, workers)].put([(problem.initial_state, 0, ())])
+    processes = [mp.Process(target=hda_star_worker, daemon=True,
+                            args=(problem, h, index, inboxes, results, incumbent, idle, sent, received, stop, batch_size))
+                 for index in range(workers)]
+    for process in processes:
+        process.start()
+
+    def snapshot():
+        return sent.value, received.value, all(idle)
+
+    try:
+        previous = None
+        while True:
+            current = snapshot()
+            if current == previous and current[0] == current[1] and current[2]:
+                break
+            previous = current
+            if any(process.exitcode not in (None, 0) for process in processes): # one crashed worker stalls the rest
+                raise RuntimeError('HDA* workers exited before the search finished')
+            stop.wait(0.01)
+        stop.set()
+        best, per_worker = None, [0] * workers
+        for _ in range(workers):
+            while True:
+                message = results.get()
+                if message[0] == 'expanded':
+                    per_worker[message[1]] = message[2]
+                    break
+                if best is None or message[1] < best[0]:
+                    best = message[1:]
+    finally:
+        stop.set()
+        for process in processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+    if expansions is not None:
+        expansions.extend(per_worker)
+    if best is None:
+        return None
+    node = Node(problem.initial_state)
+    for action in best[1]:
+        state = problem.result(node.state, action)
+        node = node.child(state, action, node.path_cost + problem.action_cost(node.state, action, state))
+    return node
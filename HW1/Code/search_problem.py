@@ -1,13 +1,134 @@
 import numpy as np
+from bisect import bisect_left, bisect_right
 from copy import deepcopy
+import hashlib, os, tempfile
+from array import array
+
+# Direction codes used by the packed state encoding
+DIRECTIONS = ('north', 'east', 'south', 'west')
+DIRECTION_CODES = {forw: code for code, forw in enumerate(DIRECTIONS)}
+DIRECTION_DELTAS = ((-1, 0), (0, 1), (1, 0), (0, -1)) # (delta_row, delta_col) per direction code
 
 class GridHunterProblem:
-    def __init__(self, initial_agent_info, N, monster_coords):
+    def __init__(self, initial_agent_info, N, monster_coords, packed=False):
         self.N = N # Grid size
         self.monster_coords = monster_coords # List of (row, col) tuples for monster positions
+        self.max_health = initial_agent_info[3] # Health never increases
         # Create initial state with all monsters alive (False = alive)
         monster_states = tuple(False for _ in monster_coords)
         self.initial_state = initial_agent_info + (0,) + monster_states
+        
+        # Packed state layout, from the lowest bits up: mstep (2 bits), direction (2 bits), health,
+        # col, row, then one alive bit per monster (bit i set = monster i alive)
+        self.health_bits = max(1, self.max_health.bit_length())
+        self.coord_bits = max(1, (N - 1).bit_length())
+        self.health_shift = 4
+        self.col_shift = self.health_shift + self.health_bits
+        self.row_shift = self.col_shift + self.coord_bits
+        self.alive_shift = self.row_shift + self.coord_bits
+        self.health_mask = (1 << self.health_bits) - 1
+        self.coord_mask = (1 << self.coord_bits) - 1
+        
+        # With packed=True, states are single ints (see encode_state) instead of tuples
+        self.packed = packed
+        if packed:
+            self.initial_state = self.encode_state(self.initial_state)
+        
+        self.build_monster_tables()
+
+    def build_monster_tables(self):
+        # Monster motion has period 4, so precompute everything per timestep (mstep 0..3):
+        #   monster_positions[t]: (row, col) of each monster
+        #   cell_monsters[t]: (row, col) -> tuple of indices of the monsters on that cell
+        #   cell_masks[t]: (row, col) -> bitmask of the monsters on that cell (occupancy bitmap)
+        #   row_monsters[t][row] / col_monsters[t][col]: (col, i) / (row, i) pairs sorted by position
+        #   row_masks[t][row]: bitmask of the monsters on that row
+        #   row_keys[t][row] / col_keys[t][col]: sorted positions along the line (for bisect), and
+        #   row_prefix_masks[t][row][k] / col_prefix_masks[t][col][k]: bitmask of the first k monsters on the line
+        self.monster_positions = []
+        self.cell_monsters = []
+        self.cell_masks = []
+        self.row_monsters = []
+        self.col_monsters = []
+        self.row_masks = []
+        self.row_keys, self.col_keys = [], []
+        self.row_prefix_masks, self.col_prefix_masks = [], []
+        for timestep in range(4):
+            positions = tuple(self.move_monsters(timestep))
+            cell_monsters, cell_masks = {}, {}
+            row_monsters = [[] for _ in range(self.N)]
+            col_monsters = [[] for _ in range(self.N)]
+            row_masks = [0] * self.N
+            for i, (m_row, m_col) in enumerate(positions):
+                cell_monsters[(m_row, m_col)] = cell_monsters.get((m_row, m_col), ()) + (i,)
+                cell_masks[(m_row, m_col)] = cell_masks.get((m_row, m_col), 0) | (1 << i)
+                row_monsters[m_row].append((m_col, i))
+                col_monsters[m_col].append((m_row, i))
+                row_masks[m_row] |= 1 << i
+            for line in row_monsters + col_monsters:
+                line.sort()
+            self.row_keys.append([[pos for pos, _ in line] for line in row_monsters])
+            self.col_keys.append([[pos for pos, _ in line] for line in col_monsters])
+            self.row_prefix_masks.append([self.prefix_masks(line) for line in row_monsters])
+            self.col_prefix_masks.append([self.prefix_masks(line) for line in col_monsters])
+            self.monster_positions.append(positions)
+            self.cell_monsters.append(cell_monsters)
+            self.cell_masks.append(cell_masks)
+            self.row_monsters.append(row_monsters)
+            self.col_monsters.append(col_monsters)
+            self.row_masks.append(row_masks)
+
+    @staticmethod
+    def prefix_masks(line):
+        # masks[k] = bitmask of the first k monsters of a sorted (position, index) line
+        masks = [0]
+        for _, i in line:
+            masks.append(masks[-1] | (1 << i))
+        return masks
+
+    def ray_bounds(self, row, col, dir_code, timestep):
+        # The monsters hit by an arrow shot from (row, col) in direction dir_code at timestep are
+        # line[start:stop] of the sorted row/column index: returns (line, prefix_masks, start, stop)
+        if dir_code == 0 or dir_code == 2: # north / south: monsters in the agent's column
+            line, keys, masks, pos = self.col_monsters[timestep][col], self.col_keys[timestep][col], \
+                self.col_prefix_masks[timestep][col], row
+        else: # east / west: monsters in the agent's row
+            line, keys, masks, pos = self.row_monsters[timestep][row], self.row_keys[timestep][row], \
+                self.row_prefix_masks[timestep][row], col
+        if dir_code == 0 or dir_code == 3: # towards lower positions
+            return line, masks, 0, bisect_left(keys, pos)
+        return line, masks, bisect_right(keys, pos), len(line)
+
+    def ray_mask(self, row, col, dir_code, timestep):
+        # Bitmask of all monsters on the arrow's ray (alive or not)
+        _, masks, start, stop = self.ray_bounds(row, col, dir_code, timestep)
+        return masks[stop] ^ masks[start]
+
+    def ray_monsters(self, row, col, dir_code, timestep):
+        # Indices of all monsters on the arrow's ray (alive or not)
+        line, _, start, stop = self.ray_bounds(row, col, dir_code, timestep)
+        return [i for _, i in line[start:stop]]
+
+    def encode_state(self, state):
+        # Pack a tuple state into one int. Health <= 0 is stored as 0 (the agent is dead either way)
+        row, col, forw, health, mstep = state[:5]
+        alive_mask = 0
+        for i, dead in enumerate(state[5:]):
+            if not dead:
+                alive_mask |= 1 << i
+        return ((alive_mask << self.alive_shift) | (row << self.row_shift) | (col << self.col_shift)
+                | (max(health, 0) << self.health_shift) | (DIRECTION_CODES[forw] << 2) | mstep)
+
+    def decode_state(self, code):
+        # Unpack an int state back into the tuple representation
+        alive_mask = code >> self.alive_shift
+        monster_states = tuple(not (alive_mask >> i) & 1 for i in range(len(self.monster_coords)))
+        return ((code >> self.row_shift) & self.coord_mask, (code >> self.col_shift) & self.coord_mask,
+                DIRECTIONS[(code >> 2) & 3], (code >> self.health_shift) & self.health_mask, code & 3) + monster_states
+
+    def pack(self, state):
+        # Convert a tuple state to the problem's representation
+        return self.encode_state(state) if self.packed else state
 
     def move_monsters(self, timestep):
         new_positions = [] # New monster positions
@@ -22,6 +143,8 @@ class GridHunterProblem:
         return new_positions
 
     def actions(self, state):
+        if self.packed:
+            return self.actions_packed(state)
         row, col, forw, health = state[:4] # Agent info
         
         # Check if agent is dead
@@ -50,12 +173,14 @@ class GridHunterProblem:
         return all_actions
 
     def result(self, state, action):
+        if self.packed:
+            return self.result_packed(state, action)
         row, col, forw, health, mstep = state[:5]
         monster_states = list(state[5:])
         
-        # Update timestep and monster positions
+        # Update timestep; monster positions come from the precomputed tables for new_mstep
         new_mstep = (mstep + 1) % 4
-        new_monster_positions = self.move_monsters(new_mstep)
+        cell_monsters = self.cell_monsters[new_mstep]
         
         # Handle different actions
         new_row, new_col, new_forw = row, col, forw
@@ -84,57 +209,512 @@ class GridHunterProblem:
             'west': 'north'
             }[forw]
         elif action == 'shoot-arrow':
-            # Get arrow path based on direction
-            arrow_row, arrow_col = new_row, new_col
-            while True:
-                if forw == 'north':
-                    arrow_row -= 1
-                elif forw == 'south':
-                    arrow_row += 1
-                elif forw == 'east':
-                    arrow_col += 1
-                elif forw == 'west':
-                    arrow_col -= 1
-                    
-                # Check if arrow hit wall
-                if arrow_row < 0 or arrow_row >= self.N or arrow_col < 0 or arrow_col >= self.N:
-                    break
-                    
-                # Check if arrow hits any monsters
-                for i, (m_row, m_col) in enumerate(new_monster_positions):
-                    if arrow_row == m_row and arrow_col == m_col and not monster_states[i]:
-                        monster_states[i] = True  # Monster dies
+            # The arrow flies to the wall and kills every monster on its ray: look them up in the
+            # sorted row/column index of the new timestep instead of walking cell by cell
+            for i in self.ray_monsters(row, col, DIRECTION_CODES[forw], new_mstep):
+                monster_states[i] = True  # Monster dies
                         
         # Check for damage from alive monsters
         new_health = health
-        for i, (m_row, m_col) in enumerate(new_monster_positions):
+        for i in cell_monsters.get((new_row, new_col), ()):
             if not monster_states[i]:  # If monster is alive
-                if new_row == m_row and new_col == m_col:
-                    new_health -= 1
+                new_health -= 1
                     
         return (new_row, new_col, new_forw, new_health, new_mstep) + tuple(monster_states)
 
+    def goal_states(self):
+        # Enumerate all goal states: all monsters dead, agent alive (health up to the initial health),
+        # any position, direction and timestep
+        max_health = self.max_health
+        monster_states = tuple(True for _ in self.monster_coords)
+        for row in range(self.N):
+            for col in range(self.N):
+                for forw in ('north', 'east', 'south', 'west'):
+                    for health in range(1, max_health + 1):
+                        for mstep in range(4):
+                            yield self.pack((row, col, forw, health, mstep) + monster_states)
+
+    def predecessors(self, state):
+        # Inverse of result: yields (action, previous_state, cost) for every state that reaches state by action
+        if self.packed:
+            state = self.decode_state(state)
+        row, col, forw, health, mstep = state[:5]
+        monster_states = state[5:]
+        max_health = self.max_health
+        prev_mstep = (mstep - 1) % 4
+        cell_monsters = self.cell_monsters[mstep] # Monster positions after the action
+        
+        # Damage taken at the end of the action, from monsters still alive after it
+        damage = 0
+        for i in cell_monsters.get((row, col), ()):
+            if not monster_states[i]:
+                damage += 1
+        prev_health = health + damage
+        # The agent must have been alive to act, and can never have had more than its initial health
+        if prev_health <= 0 or prev_health > max_health:
+            return
+        
+        direction_deltas = {
+            'north': (-1, 0),
+            'south': (1, 0),
+            'east': (0, 1),
+            'west': (0, -1)
+        }
+        right_of = {'north': 'east', 'east': 'south', 'south': 'west', 'west': 'north'}
+        left_of = {'north': 'west', 'west': 'south', 'south': 'east', 'east': 'north'}
+        
+        # stay
+        yield 'stay', self.pack((row, col, forw, prev_health, prev_mstep) + monster_states), 1
+        
+        # move-forward: came from the cell behind the agent
+        delta_row, delta_col = direction_deltas[forw]
+        prev_row, prev_col = row - delta_row, col - delta_col
+        if 0 <= prev_row < self.N and 0 <= prev_col < self.N:
+            yield 'move-forward', self.pack((prev_row, prev_col, forw, prev_health, prev_mstep) + monster_states), 1
+        
+        # turn-left: the agent was facing the direction whose left is forw (and vice versa)
+        yield 'turn-left', self.pack((row, col, right_of[forw], prev_health, prev_mstep) + monster_states), 1
+        yield 'turn-right', self.pack((row, col, left_of[forw], prev_health, prev_mstep) + monster_states), 1
+        
+        # shoot-arrow: kills every alive monster on the ray, so all monsters on the ray are dead now
+        # and any subset of them may have been alive before the shot
+        on_ray = self.ray_monsters(row, col, DIRECTION_CODES[forw], mstep)
+        for i in on_ray:
+            if not monster_states[i]:
+                return # an alive monster on the ray: no shot leads here
+        for subset in range(1 << len(on_ray)):
+            prev_monster_states = list(monster_states)
+            for bit, i in enumerate(on_ray):
+                if subset >> bit & 1:
+                    prev_monster_states[i] = False # was alive before the shot
+            yield 'shoot-arrow', self.pack((row, col, forw, prev_health, prev_mstep) + tuple(prev_monster_states)), 1
+
+    def successors(self, state):
+        # All (action, child_state, cost) triples of state at once, in the same order as actions(state).
+        # The timestep, monster tables and damage on the agent's cell are computed once for all actions
+        if self.packed:
+            return self.successors_packed(state)
+        row, col, forw, health, mstep = state[:5]
+        if health <= 0:
+            return []
+        monster_states = state[5:]
+        new_mstep = (mstep + 1) % 4
+        cell_monsters = self.cell_monsters[new_mstep]
+        dir_code = DIRECTION_CODES[forw]
+        
+        def damage(at_row, at_col, states):
+            return sum(1 for i in cell_monsters.get((at_row, at_col), ()) if not states[i])
+        
+        triples = []
+        tail = (new_mstep,) + monster_states
+        delta_row, delta_col = DIRECTION_DELTAS[dir_code]
+        next_row, next_col = row + delta_row, col + delta_col
+        if 0 <= next_row < self.N and 0 <= next_col < self.N:
+            triples.append(('move-forward', (next_row, next_col, forw,
+                            health - damage(next_row, next_col, monster_states)) + tail, 1))
+        here_health = health - damage(row, col, monster_states)
+        triples.append(('turn-left', (row, col, DIRECTIONS[(dir_code - 1) % 4], here_health) + tail, 1))
+        triples.append(('turn-right', (row, col, DIRECTIONS[(dir_code + 1) % 4], here_health) + tail, 1))
+        shot_states = list(monster_states)
+        for i in self.ray_monsters(row, col, dir_code, new_mstep):
+            shot_states[i] = True
+        triples.append(('shoot-arrow', (row, col, forw, health - damage(row, col, shot_states), new_mstep)
+                        + tuple(shot_states), 1))
+        triples.append(('stay', (row, col, forw, here_health) + tail, 1))
+        return triples
+
+    def expand_batch(self, states):
+        # Successors of many states at once, computed with NumPy over a (states x monsters) grid.
+        # Returns a list with one list of (action, child_state, cost) triples per state,
+        # equal to [self.successors(s) for s in states]
+        K, M = len(states), len(self.monster_coords)
+        if K == 0:
+            return []
+        if self.packed:
+            codes = states
+            fields = np.array([((c >> self.row_shift) & self.coord_mask, (c >> self.col_shift) & self.coord_mask,
+                                (c >> 2) & 3, (c >> self.health_shift) & self.health_mask, c & 3)
+                               for c in codes], dtype=np.int64).reshape(K, 5)
+            n_bytes = max(1, (M + 7) // 8)
+            alive_bytes = np.frombuffer(b''.join((c >> self.alive_shift).to_bytes(n_bytes, 'little') for c in codes),
+                                        dtype=np.uint8).reshape(K, n_bytes)
+            alive = np.unpackbits(alive_bytes, axis=1, bitorder='little')[:, :M].astype(bool)
+        else:
+            fields = np.array([(s[0], s[1], DIRECTION_CODES[s[2]], s[3], s[4]) for s in states],
+                              dtype=np.int64).reshape(K, 5)
+            alive = ~np.array([s[5:] for s in states], dtype=bool).reshape(K, M)
+        rows, cols, dirs, healths, msteps = fields.T
+        new_msteps = (msteps + 1) % 4
+        
+        # Monster positions at each state's new timestep: (K, M) arrays
+        positions = np.array(self.monster_positions, dtype=np.int64).reshape(4, M, 2)
+        m_rows, m_cols = positions[new_msteps, :, 0], positions[new_msteps, :, 1]
+        
+        def damage(at_rows, at_cols, alive_now):
+            return (alive_now & (m_rows == at_rows[:, None]) & (m_cols == at_cols[:, None])).sum(axis=1)
+        
+        deltas = np.array(DIRECTION_DELTAS, dtype=np.int64)
+        next_rows, next_cols = rows + deltas[dirs, 0], cols + deltas[dirs, 1]
+        can_move = (next_rows >= 0) & (next_rows < self.N) & (next_cols >= 0) & (next_cols < self.N)
+        move_healths = healths - damage(next_rows, next_cols, alive)
+        here_healths = healths - damage(rows, cols, alive)
+        # Monsters strictly ahead of the agent on its column (north/south) or row (east/west)
+        on_ray = np.where((dirs == 0)[:, None], (m_cols == cols[:, None]) & (m_rows < rows[:, None]),
+                 np.where((dirs == 2)[:, None], (m_cols == cols[:, None]) & (m_rows > rows[:, None]),
+                 np.where((dirs == 1)[:, None], (m_rows == rows[:, None]) & (m_cols > cols[:, None]),
+                                                (m_rows == rows[:, None]) & (m_cols < cols[:, None]))))
+        shot_alive = alive & ~on_ray
+        shot_healths = healths - damage(rows, cols, shot_alive)
+        
+        if self.packed:
+            alive_codes = [code >> self.alive_shift for code in codes]
+            shot_codes = [int.from_bytes(row.tobytes(), 'little')
+                          for row in np.packbits(shot_alive, axis=1, bitorder='little')]
+            make = (lambda r, c, d, h, m, k, shot: (((shot_codes[k] if shot else alive_codes[k]) << self.alive_shift)
+                    | (r << self.row_shift) | (c << self.col_shift) | (max(h, 0) << self.health_shift) | (d << 2) | m))
+        else:
+            shot_dead = [tuple(row) for row in (~shot_alive).tolist()]
+            make = (lambda r, c, d, h, m, k, shot: (r, c, DIRECTIONS[d], h, m)
+                    + (shot_dead[k] if shot else states[k][5:]))
+        
+        batch = []
+        for k, (r, c, d, h, m, nr, nc, mv, mh, hh, sh) in enumerate(zip(
+                rows.tolist(), cols.tolist(), dirs.tolist(), healths.tolist(), new_msteps.tolist(),
+                next_rows.tolist(), next_cols.tolist(), can_move.tolist(), move_healths.tolist(),
+                here_healths.tolist(), shot_healths.tolist())):
+            if h <= 0:
+                batch.append([])
+                continue
+            triples = []
+            if mv:
+                triples.append(('move-forward', make(nr, nc, d, mh, m, k, False), 1))
+            triples.append(('turn-left', make(r, c, (d - 1) % 4, hh, m, k, False), 1))
+            triples.append(('turn-right', make(r, c, (d + 1) % 4, hh, m, k, False), 1))
+            triples.append(('shoot-arrow', make(r, c, d, sh, m, k, True), 1))
+            triples.append(('stay', make(r, c, d, hh, m, k, False), 1))
+            batch.append(triples)
+        return batch
+
     def action_cost(self, state1, action, state2):
         return 1 # All actions have cost 1
 
     def is_goal(self, state):
+        if self.packed:
+            # No monster alive and agent alive
+            return state >> self.alive_shift == 0 and (state >> self.health_shift) & self.health_mask > 0
         health = state[3] # Agent health
         monster_states = state[5:] # Monster states
         return all(monster_states) and health > 0 # All monsters dead and agent alive
 
     def h(self, node):
+        if self.packed:
+            return self.h_packed(node.state)
         if self.is_goal(node.state): # If goal state reached
             return 0 # Heuristic is 0
             
         row = node.state[0] # Agent row
-        monster_positions = self.move_monsters(node.state[4]) # Monster positions at next timestep
+        row_monsters = self.row_monsters[node.state[4]] # Monsters per row at the state's timestep
         monster_states = node.state[5:] # Monster states (alive or dead)
         
-        # Find minimum row distance to any alive monster
-        min_distance = float('inf')
-        for i, (m_row, _) in enumerate(monster_positions):
-            if not monster_states[i]:  # If monster is alive
-                distance = abs(row - m_row) # Manhattan distance to monster row position
-                min_distance = min(min_distance, distance) # Update minimum distance
+        # Find minimum row distance to any alive monster: scan rows outward from the agent's row
+        for distance in range(self.N):
+            for m_row in (row - distance, row + distance):
+                if 0 <= m_row < self.N:
+                    for _, i in row_monsters[m_row]:
+                        if not monster_states[i]:  # If monster is alive
+                            return distance
                 
-        return min_distance
\ No newline at end of file
+        return float('inf')
+
+    ############################ Packed-state versions ############################
+    # Same semantics as actions / result / h, working directly on the int encoding
+
+    def actions_packed(self, state):
+        if (state >> self.health_shift) & self.health_mask == 0: # Agent is dead
+            return []
+        row, col = (state >> self.row_shift) & self.coord_mask, (state >> self.col_shift) & self.coord_mask
+        delta_row, delta_col = DIRECTION_DELTAS[(state >> 2) & 3]
+        next_row, next_col = row + delta_row, col + delta_col
+        if next_row < 0 or next_row >= self.N or next_col < 0 or next_col >= self.N:
+            return ['turn-left', 'turn-right', 'shoot-arrow', 'stay']
+        return ['move-forward', 'turn-left', 'turn-right', 'shoot-arrow', 'stay']
+
+    def result_packed(self, state, action):
+        row, col = (state >> self.row_shift) & self.coord_mask, (state >> self.col_shift) & self.coord_mask
+        dir_code = (state >> 2) & 3
+        health = (state >> self.health_shift) & self.health_mask
+        alive_mask = state >> self.alive_shift
+        new_mstep = ((state & 3) + 1) % 4
+        cell_masks = self.cell_masks[new_mstep]
+        
+        if action == 'move-forward':
+            delta_row, delta_col = DIRECTION_DELTAS[dir_code]
+            row, col = row + delta_row, col + delta_col
+        elif action == 'turn-left':
+            dir_code = (dir_code - 1) % 4
+        elif action == 'turn-right':
+            dir_code = (dir_code + 1) % 4
+        elif action == 'shoot-arrow':
+            # Kill every monster on the ray in one mask operation
+            alive_mask &= ~self.ray_mask(row, col, dir_code, new_mstep)
+        
+        # Damage from alive monsters on the agent's cell
+        health -= bin(cell_masks.get((row, col), 0) & alive_mask).count('1')
+        
+        return ((alive_mask << self.alive_shift) | (row << self.row_shift) | (col << self.col_shift)
+                | (max(health, 0) << self.health_shift) | (dir_code << 2) | new_mstep)
+
+    def h_packed(self, state):
+        alive_mask = state >> self.alive_shift
+        if self.is_goal(state):
+            return 0
+        row = (state >> self.row_shift) & self.coord_mask
+        row_masks = self.row_masks[state & 3]
+        for distance in range(self.N):
+            if (row - distance >= 0 and row_masks[row - distance] & alive_mask) or \
+                    (row + distance < self.N and row_masks[row + distance] & alive_mask):
+                return distance
+        return float('inf')
+
+    def successors_packed(self, state):
+        health = (state >> self.health_shift) & self.health_mask
+        if health == 0: # Agent is dead
+            return []
+        row, col = (state >> self.row_shift) & self.coord_mask, (state >> self.col_shift) & self.coord_mask
+        dir_code = (state >> 2) & 3
+        alive_mask = state >> self.alive_shift
+        new_mstep = ((state & 3) + 1) % 4
+        cell_masks = self.cell_masks[new_mstep]
+        
+        # Everything but position, direction and health is shared by the non-shooting children
+        base = (alive_mask << self.alive_shift) | new_mstep
+        here_health = max(health - bin(cell_masks.get((row, col), 0) & alive_mask).count('1'), 0)
+        here = base | (row << self.row_shift) | (col << self.col_shift) | (here_health << self.health_shift)
+        triples = []
+        delta_row, delta_col = DIRECTION_DELTAS[dir_code]
+        next_row, next_col = row + delta_row, col + delta_col
+        if 0 <= next_row < self.N and 0 <= next_col < self.N:
+            move_health = max(health - bin(cell_masks.get((next_row, next_col), 0) & alive_mask).count('1'), 0)
+            triples.append(('move-forward', base | (next_row << self.row_shift) | (next_col << self.col_shift)
+                            | (move_health << self.health_shift) | (dir_code << 2), 1))
+        triples.append(('turn-left', here | (((dir_code - 1) % 4) << 2), 1))
+        triples.append(('turn-right', here | (((dir_code + 1) % 4) << 2), 1))
+        shot_mask = alive_mask & ~self.ray_mask(row, col, dir_code, new_mstep)
+        shot_health = max(health - bin(cell_masks.get((row, col), 0) & shot_mask).count('1'), 0)
+        triples.append(('shoot-arrow', (shot_mask << self.alive_shift) | (row << self.row_shift)
+                        | (col << self.col_shift) | (shot_health << self.health_shift) | (dir_code << 2) | new_mstep, 1))
+        triples.append(('stay', here | (dir_code << 2), 1))
+        return triples
+
+
+# Default directory for PatternDatabaseHeuristic tables (cache_dir=None keeps them in memory only)
+PDB_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'gridhunter_pdb')
+
+class PatternDatabaseHeuristic:
+    """
+    Admissible heuristic for GridHunterProblem from pattern databases. The monsters are split into
+    groups; for each group a table holds the exact number of actions needed to kill every still-alive
+    monster of the group from (alive subset, row, col, direction, mstep), in the relaxed problem where
+    health is ignored and the other monsters do not matter. Every real plan is also a plan of the
+    relaxed problem, so each table value is a lower bound, and h is the max over the groups.
+    Tables are built by a backward breadth-first search over all abstract states and stored as
+    .npy files in cache_dir, named by a hash of N, the monster layout and the group, so later problems
+    on the same map load them instead of rebuilding.
+        h = PatternDatabaseHeuristic(problem); astar_search(problem, h=h)
+    """
+    UNREACHABLE = np.iinfo(np.int32).max
+
+    def __init__(self, problem, group_size=4, groups=None, cache_dir=PDB_CACHE_DIR):
+        self.problem = problem
+        self.N = problem.N
+        n_monsters = len(problem.monster_coords)
+        if groups is None:
+            groups = [tuple(range(start, min(start + group_size, n_monsters)))
+                      for start in range(0, n_monsters, group_size)]
+        self.groups = [tuple(group) for group in groups]
+        self.cache_dir = cache_dir
+        # flat int32 tables as array('i'): as compact as the NumPy table (a list would box every entry),
+        # and indexing one returns a plain int, which is much faster than indexing a NumPy array per call
+        self.tables = [self.flat_table(self.load_or_build(group)) for group in self.groups]
+
+    def flat_table(self, table):
+        flat = array('i')
+        flat.frombytes(np.ascontiguousarray(table, dtype=np.int32).tobytes())
+        return flat
+
+    def cache_path(self, group):
+        key = repr((self.N, [tuple(coord) for coord in self.problem.monster_coords], group))
+        return os.path.join(self.cache_dir, 'pdb_{}.npy'.format(hashlib.sha1(key.encode()).hexdigest()))
+
+    def load_or_build(self, group):
+        if self.cache_dir is None:
+            return self.build_table(group)
+        path = self.cache_path(group)
+        if os.path.exists(path):
+            return np.load(path)
+        table = self.build_table(group)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # write to a temporary name first so a concurrent reader never sees a partial file
+        temp_path = '{}.{}.tmp.npy'.format(path[:-4], os.getpid())
+        np.save(temp_path, table)
+        os.replace(temp_path, path)
+        return table
+
+    def build_table(self, group):
+        # Abstract states are indexed as (subset, row, col, dir, mstep) in C order; subset bit b set
+        # means monster group[b] is alive. One extra index (n_states) stands for "no such action".
+        N = self.N
+        subsets = 1 << len(group)
+        bit_of = {i: b for b, i in enumerate(group)}
+        # ray_bits[row, col, dir, mstep]: group monsters on the arrow's ray
+        ray_bits = np.zeros((N, N, 4, 4), dtype=np.int64)
+        for row in range(N):
+            for col in range(N):
+                for dir_code in range(4):
+                    for mstep in range(4):
+                        for i in self.problem.ray_monsters(row, col, dir_code, mstep):
+                            if i in bit_of:
+                                ray_bits[row, col, dir_code, mstep] |= 1 << bit_of[i]
+        
+        shape = (subsets, N, N, 4, 4)
+        n_states = subsets * N * N * 16
+        subset, row, col, dir_code, mstep = (index.ravel() for index in np.indices(shape))
+        new_mstep = (mstep + 1) % 4
+        index = (lambda s, r, c, d, m: np.ravel_multi_index((s, r, c, d, m), shape))
+        
+        successors = np.empty((n_states, 5), dtype=np.int64)
+        next_row = row + np.array([delta[0] for delta in DIRECTION_DELTAS])[dir_code]
+        next_col = col + np.array([delta[1] for delta in DIRECTION_DELTAS])[dir_code]
+        inside = (next_row >= 0) & (next_row < N) & (next_col >= 0) & (next_col < N)
+        successors[:, 0] = np.where(inside, index(subset, np.clip(next_row, 0, N - 1), np.clip(next_col, 0, N - 1),
+                                                  dir_code, new_mstep), n_states) # move-forward
+        successors[:, 1] = index(subset, row, col, (dir_code - 1) % 4, new_mstep) # turn-left
+        successors[:, 2] = index(subset, row, col, (dir_code + 1) % 4, new_mstep) # turn-right
+        successors[:, 3] = index(subset & ~ray_bits[row, col, dir_code, new_mstep], row, col, dir_code, new_mstep) # shoot-arrow
+        successors[:, 4] = index(subset, row, col, dir_code, new_mstep) # stay
+        
+        # backward BFS from the goal layer (no group monster alive), one layer per cost
+        distance = np.full(n_states + 1, self.UNREACHABLE, dtype=np.int32)
+        layer = np.zeros(n_states + 1, dtype=bool)
+        layer[:n_states] = subset == 0
+        distance[layer] = 0
+        cost = 0
+        while layer.any():
+            cost += 1
+            layer[:n_states] = (distance[:n_states] == self.UNREACHABLE) & layer[successors].any(axis=1)
+            distance[layer] = cost
+        return distance[:n_states].reshape(shape)
+
+    def __call__(self, node):
+        state = node.state
+        problem = self.problem
+        if problem.packed:
+            alive_mask = state >> problem.alive_shift
+            row, col = (state >> problem.row_shift) & problem.coord_mask, (state >> problem.col_shift) & problem.coord_mask
+            dir_code, mstep = (state >> 2) & 3, state & 3
+            alive = (lambda i: (alive_mask >> i) & 1)
+        else:
+            row, col, forw, _, mstep = state[:5]
+            dir_code = DIRECTION_CODES[forw]
+            alive = (lambda i: not state[5 + i])
+        position = ((row * self.N + col) * 4 + dir_code) * 4 + mstep
+        cells = self.N * self.N * 16
+        best = 0
+        for group, table in zip(self.groups, self.tables):
+            subset = 0
+            for b, i in enumerate(group):
+                if alive(i):
+                    subset |= 1 << b
+            value = table[subset * cells + position]
+            if value == self.UNREACHABLE:
+                return float('inf')
+            if value > best:
+                best = value
+        return best
+
+class MacroGridHunterProblem(GridHunterProblem):
+    """
+    GridHunterProblem with macro actions, so runs of moves and turns take one search step:
+        'move-forward-k': move k cells forward (k = 1 .. up to the wall, or max_run), cost k
+        'face-<direction>': turn to face that direction with the fewest turns, cost 1 or 2
+        'shoot-arrow', 'stay': as in GridHunterProblem, cost 1
+    Each macro is applied as its sequence of primitive actions, so timesteps, monster motion and damage
+    are exactly those of the primitive plan (a run stops early once the agent is dead). Every primitive
+    action is also a macro, so optimal costs are unchanged. primitive_plan turns a macro plan back into
+    primitive actions.
+    Plans get much shallower (fewer search steps per solution), but every state now has up to max_run
+    move children, so graph searches pop the same states and generate more nodes; lower max_run to
+    trade plan depth for branching.
+    Macros have no inverse, so the backward-search protocol (goal_states, predecessors) is not supported
+    and bidirectional_search rejects this problem up front.
+    """
+    goal_states = None
+    predecessors = None
+
+    def __init__(self, initial_agent_info, N, monster_coords, packed=False, max_run=None):
+        super().__init__(initial_agent_info, N, monster_coords, packed)
+        self.max_run = N - 1 if max_run is None else max_run
+
+    def direction_code(self, state):
+        return (state >> 2) & 3 if self.packed else DIRECTION_CODES[state[2]]
+
+    def is_alive(self, state):
+        return (state >> self.health_shift) & self.health_mask > 0 if self.packed else state[3] > 0
+
+    def primitive_actions(self, state, action):
+        # The primitive actions a macro stands for, when taken from state
+        if action.startswith('move-forward-'):
+            return ['move-forward'] * int(action[len('move-forward-'):])
+        if action.startswith('face-'):
+            turns = (DIRECTION_CODES[action[len('face-'):]] - self.direction_code(state)) % 4
+            return {1: ['turn-right'], 2: ['turn-left', 'turn-left'], 3: ['turn-left']}[turns]
+        return [action]
+
+    def primitive_plan(self, actions):
+        # Expand a plan of macros (from the initial state) into primitive actions
+        plan = []
+        state = self.initial_state
+        for action in actions:
+            for primitive in self.primitive_actions(state, action):
+                plan.append(primitive)
+                state = GridHunterProblem.result(self, state, primitive)
+        return plan
+
+    def successors(self, state):
+        if not self.is_alive(state):
+            return []
+        triples = []
+        primitive = {action: child for action, child, _ in GridHunterProblem.successors(self, state)}
+        # move runs: one more primitive move per k, stopping at the wall or when the agent dies
+        child, k = state, 0
+        while k < self.max_run and self.is_alive(child):
+            moves = [c for a, c, _ in GridHunterProblem.successors(self, child) if a == 'move-forward'] if k else \
+                    [primitive['move-forward']] if 'move-forward' in primitive else []
+            if not moves:
+                break
+            child, k = moves[0], k + 1
+            triples.append(('move-forward-{}'.format(k), child, k))
+        dir_code = self.direction_code(state)
+        turned_left = primitive['turn-left']
+        triples.append(('face-' + DIRECTIONS[(dir_code - 1) % 4], turned_left, 1))
+        triples.append(('face-' + DIRECTIONS[(dir_code + 1) % 4], primitive['turn-right'], 1))
+        if self.is_alive(turned_left):
+            triples.append(('face-' + DIRECTIONS[(dir_code + 2) % 4],
+                            GridHunterProblem.result(self, turned_left, 'turn-left'), 2))
+        triples.append(('shoot-arrow', primitive['shoot-arrow'], 1))
+        triples.append(('stay', primitive['stay'], 1))
+        return triples
+
+    def actions(self, state):
+        return [action for action, _, _ in self.successors(state)]
+
+    def result(self, state, action):
+        for primitive in self.primitive_actions(state, action):
+            state = GridHunterProblem.result(self, state, primitive)
+        return state
+
+    def action_cost(self, state1, action, state2):
+        return len(self.primitive_actions(state1, action))
+
+    def expand_batch(self, states):
+        return [self.successors(state) for state in states]
@@ -76,4 +76,67 @@ if __name__ == "__main__":
     print('Initial state objective value: {}'.format(initial_fcost))
     print('Final state objective value: {}.\nFinal subset: {}.'.format(final_fcost, final_Bsubset))
     print('# iterations: {}'.format(iters)) 
-    print('_______________________________________________________________________')
\ No newline at end of file
+    print('_______________________________________________________________________')    
+    # incremental engine: same RNG stream, same final state and iteration count
+    for N, initial_temp in [(20, 30000), (40, 1000000)]:
+        results = []
+        for annealer in (simulated_annealing, simulated_annealing_incremental):
+            np.random.seed(rand_seed)
+            S, T, B_subset = gen_rand_ssp(N=N)
+            initial_state = sample_random_subset_state(N)
+            final_state, iters = annealer(initial_state, S, T, initial_temp=initial_temp)
+            results.append((list(final_state), iters, objective_f(final_state, S, T)))
+        print('N = {}: incremental objective {} in {} iterations (same as simulated_annealing: {})'.format(
+              N, results[1][2], results[1][1], results[0] == results[1]))
+        assert results[0] == results[1]
+    print('_______________________________________________________________________')
+    
+    # flip neighborhood: proposals are O(1), flips are applied in place and keep the on/off arrays in sync
+    np.random.seed(rand_seed)
+    state = sample_random_subset_state(N)
+    neighborhood = SubsetFlipNeighborhood(state)
+    for _ in range(1000):
+        idx, remove = neighborhood.propose()
+        assert (state[idx] == 1) == remove
+        if np.random.uniform() < 0.5:
+            neighborhood.apply(idx)
+    assert sorted(neighborhood.on) == [i for i in range(N) if state[i] == 1]
+    assert sorted(neighborhood.off) == [i for i in range(N) if state[i] == 0]
+    print('SubsetFlipNeighborhood: {} on / {} off bits after 1000 proposals'.format(len(neighborhood.on), len(neighborhood.off)))
+    print('_______________________________________________________________________')
+    
+    # batched chains: K annealing runs advanced together with NumPy
+    np.random.seed(rand_seed)
+    N = 20
+    S, T, B_subset = gen_rand_ssp(N=N)
+    initial_states = np.array([sample_random_subset_state(N) for _ in range(8)])
+    final_states, chain_iters, chain_fcosts = simulated_annealing_batch(initial_states, S, T, initial_temp=30000, seed=4)
+    print('Batched chains objective values: {}\n# iterations per chain: {}'.format(chain_fcosts, chain_iters))
+    assert all(objective_f(state, S, T) == fcost for state, fcost in zip(final_states, chain_fcosts))
+    print('_______________________________________________________________________')
+    
+    # cooling schedules and early stopping
+    np.random.seed(rand_seed)
+    N = 20
+    S, T, B_subset = gen_rand_ssp(N=N)
+    initial_state = sample_random_subset_state(N)
+    for schedule_name, options in [('Geometric, max_stall=500', dict(max_stall=500)),
+                                   ('Linear, n_iters=2000', dict(schedule=LinearSchedule(n_iters=2000))),
+                                   ('Logarithmic, max_iters=2000', dict(schedule=LogarithmicSchedule(), max_iters=2000)),
+                                   ('Adaptive, max_iters=5000', dict(schedule=AdaptiveSchedule(patience=500), max_iters=5000))]:
+        np.random.seed(rand_seed)
+        final_state, iters = simulated_annealing(initial_state, S, T, initial_temp=30000, **options)
+        print('{:28s} objective value {:6d} after {} iterations'.format(schedule_name, objective_f(final_state, S, T), iters))
+        assert iters <= 5000
+    print('_______________________________________________________________________')
+    
+    # parallel restarts: seeded chains in a process pool, stopping once any chain reaches 0
+    np.random.seed(rand_seed)
+    N = 40
+    S, T, B_subset = gen_rand_ssp(N=N)
+    best_state, best_fcost, chain_results = parallel_simulated_annealing(S, T, n_chains=4, initial_temp=1000000,
+                                                                         seed=rand_seed, max_workers=2)
+    # (how far the other chains get before the stop depends on process timing, so only the best is printed)
+    print('Parallel restarts best objective value: {} over {} chains'.format(best_fcost, len(chain_results)))
+    assert best_fcost == objective_f(best_state, S, T) == min(fcost for _, _, fcost in chain_results)
+    print('_______________________________________________________________________')
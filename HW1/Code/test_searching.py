@@ -3,30 +3,20 @@ from search_algorithms import *
 from collections import Counter
 
 """
-    We will use cProfile to get some function call stats. 
-    Particularly, we want to count the number of times a node is popped from frontier and is generated. 
-    To count the number of times a node is popped, we just need to count number of times pop() is called.
-    To count number of times a node is generated, notice that we call p.result.
-    So, we just need to count number of times result is called for a Problem object.
+    We will use SearchStats to get some node counts.
+    Particularly, we want to count the number of times a node is popped from frontier and is generated.
+    Each searcher takes (problem, stats) and passes stats on to the search, which fills in
+    stats.nodes_popped and stats.nodes_generated (every child produced by expand).
 """
-import cProfile, pstats, io
-from pstats import SortKey   
-def run_profiler_searches(problem, searchers_list, searcher_names_list):
+def run_stats_searches(problem, searchers_list, searcher_names_list):
     problem_name = str(problem)[:28]
     total_gen_node, total_pop_node = 0, 0
-    print('\nProfiler for problem: {}\n'.format(problem_name))
+    print('\nSearch stats for problem: {}\n'.format(problem_name))
     for search_algo, search_algo_name in zip(searchers_list, searcher_names_list):
-        pr = cProfile.Profile()
-        pr.enable()
-        goal_node = search_algo(problem)
-        pr.disable()
+        stats = SearchStats()
+        goal_node = search_algo(problem, stats)
         
-        io_stream = io.StringIO()
-        ps = pstats.Stats(pr, stream=io_stream).sort_stats(SortKey.CALLS).strip_dirs()
-        ps.print_stats("pop*|result*")
-        profiler_string = io_stream.getvalue()
-        
-        gen_node_count, pop_node_count = profiler_splitter(profiler_string)
+        gen_node_count, pop_node_count = stats.nodes_generated, stats.nodes_popped
         total_gen_node += gen_node_count
         total_pop_node += pop_node_count
         
@@ -37,17 +27,6 @@ def run_profiler_searches(problem, searchers_list, searcher_names_list):
     
     print('{:15s} {:9,d} generated nodes |{:9,d} popped'.format('TOTAL', total_gen_node, total_pop_node))
     print('________________________________________________________________________')
-
-def profiler_splitter(profiler_data):
-    profiler_data = profiler_data.split("\n")
-    result_line = [l for l in profiler_data if 'result' in l][1]
-    pop_line = [l for l in profiler_data if 'pop' in l][1]
-    
-    splitter = (lambda s: int(s.split()[0].split("/")[0]) )
-    result_calls = splitter(result_line)
-    pop_calls = splitter(pop_line)
-    
-    return result_calls, pop_calls 
     
 if __name__ == "__main__":
     # grid problem example
@@ -99,10 +78,203 @@ if __name__ == "__main__":
     ######## #######
     
     # get some statistics on generated nodes, popped nodes, solution
-    searchers = [(lambda p: breadth_first_search(p, treelike=False)), 
-                 (lambda p: uniform_cost_search(p, treelike=False)),  
-                 (lambda p: astar_search(p, h=p.h, treelike=False))]
+    searchers = [(lambda p, stats: breadth_first_search(p, treelike=False, stats=stats)), 
+                 (lambda p, stats: uniform_cost_search(p, treelike=False, stats=stats)),  
+                 (lambda p, stats: astar_search(p, h=p.h, treelike=False, stats=stats))]
     searcher_names= ['Graph-like BFS',  
                      'Graph-like UCS', 
                      'Graph-like A*']
-    run_profiler_searches(example_mhproblem, searchers, searcher_names)
+    run_stats_searches(example_mhproblem, searchers, searcher_names)
+    ucs_goal = uniform_cost_search(example_mhproblem) # reference solution for the checks below
+
+    
+    ######## frontier, node storage and path helpers #######
+    
+    # decrease-key: re-adding a key replaces its entry instead of duplicating it
+    pq = IndexedPriorityQueue(priority_function=(lambda x: x[1]), key_function=(lambda x: x[0]))
+    for item in [('a', 5), ('b', 3), ('a', 1), ('c', 4), ('b', 6)]:
+        pq.add(item)
+    popped = [pq.pop() for _ in range(len(pq))]
+    print('IndexedPriorityQueue pops: {}'.format(popped))
+    assert popped == [('a', 1), ('c', 4), ('b', 6)]
+    print('________________________________________________________________________')
+    
+    # heuristic memo: A* evaluates h at most once per state
+    h_calls = Counter()
+    def counting_h(node):
+        h_calls[node.state] += 1
+        return example_mhproblem.h(node)
+    goal_node = astar_search(example_mhproblem, h=counting_h)
+    print('A* with HeuristicCache: cost {}, {} states evaluated, max evaluations per state {}'.format(
+          goal_node.path_cost, len(h_calls), max(h_calls.values())))
+    assert max(h_calls.values()) == 1
+    print('________________________________________________________________________')
+    
+    # parent-pointer-array trees give the same solutions as Node
+    for search_algo, search_algo_name in [(breadth_first_search, 'BFS'), (uniform_cost_search, 'UCS'),
+                                          (depth_first_search, 'DFS')]:
+        tree = SearchTree()
+        tree_goal, node_goal = search_algo(example_mhproblem, node_factory=tree), search_algo(example_mhproblem)
+        print('{:5s} SearchTree cost {} ({} rows) | Node cost {}'.format(
+              search_algo_name, tree_goal.path_cost, len(tree), node_goal.path_cost))
+        assert get_path_actions(tree_goal) == get_path_actions(node_goal)
+        assert get_path_states(tree_goal) == get_path_states(node_goal)
+    print('________________________________________________________________________')
+    
+    # deep DFS path: iterative reconstruction and byte encoding round-trip
+    deep_problem = GridHunterProblem(initial_agent_info=(0, 0, 'north', 1000), N=100, monster_coords=[(99, 99), (99, 0)])
+    deep_goal = depth_first_search(deep_problem)
+    action_table = ActionTable()
+    encoded = encode_path_actions(deep_goal, action_table)
+    print('DFS solution depth {}: {} bytes encoded'.format(deep_goal.depth, len(encoded)))
+    assert decode_path_actions(encoded, action_table) == get_path_actions(deep_goal)
+    assert [n.state for n in iter_path(deep_goal)] == get_path_states(deep_goal)
+    print('________________________________________________________________________')
+    
+    # bidirectional search finds solutions as cheap as UCS
+    for strategy in ['bfs', 'ucs']:
+        bidir_goal = bidirectional_search(example_mhproblem, strategy=strategy)
+        print('Bidirectional {} cost {} | UCS cost {}'.format(strategy, bidir_goal.path_cost, ucs_goal.path_cost))
+        assert bidir_goal.path_cost == ucs_goal.path_cost
+        assert example_mhproblem.is_goal(bidir_goal.state)
+    print('________________________________________________________________________')
+    
+    # bounded-memory engines find solutions as cheap as A*
+    small_problem = GridHunterProblem(initial_agent_info=(1, 4, 'north', 10), N=5, monster_coords=[(0, 1), (2, 2)])
+    astar_goal = astar_search(small_problem, h=small_problem.h)
+    for search_algo, search_algo_name in [(ida_star_search, 'IDA*'), (recursive_best_first_search, 'RBFS')]:
+        iterations = []
+        goal_node = search_algo(small_problem, h=small_problem.h, iterations=iterations)
+        print('{:5s} cost {} in {} iterations, {:,d} generated nodes | A* cost {}'.format(
+              search_algo_name, goal_node.path_cost, len(iterations), sum(g for _, g in iterations), astar_goal.path_cost))
+        assert goal_node.path_cost == astar_goal.path_cost
+    print('________________________________________________________________________')
+    
+    # packed int states: same solution as tuple states
+    packed_problem = GridHunterProblem(initial_agent_info=(1, 4, 'north', 10), N=5,
+                                       monster_coords=example_monster_coords, packed=True)
+    packed_goal = uniform_cost_search(packed_problem)
+    print('Packed initial state {} decodes to {}'.format(packed_problem.initial_state,
+                                                         packed_problem.decode_state(packed_problem.initial_state)))
+    print('Packed UCS cost {} | tuple UCS cost {}'.format(packed_goal.path_cost, ucs_goal.path_cost))
+    assert packed_problem.decode_state(packed_goal.state) == ucs_goal.state
+    assert get_path_actions(packed_goal) == get_path_actions(ucs_goal)
+    print('________________________________________________________________________')
+    
+    # tree-like search with cycle checks and a bounded transposition table
+    for search_algo, search_algo_name in [(breadth_first_search, 'BFS'), (uniform_cost_search, 'UCS')]:
+        goal_node = search_algo(example_mhproblem, treelike=True, check_cycles=True, table_size=10000)
+        print('Tree-like {} with cycle checks and transposition table: cost {}'.format(search_algo_name, goal_node.path_cost))
+        assert goal_node.path_cost == ucs_goal.path_cost
+    goal_node = depth_first_search(example_mhproblem, treelike=True, check_cycles=True)
+    print('Tree-like DFS with cycle checks: cost {}, {} distinct states on path'.format(
+          goal_node.path_cost, len(set(get_path_states(goal_node)))))
+    assert len(set(get_path_states(goal_node))) == goal_node.depth + 1
+    print('________________________________________________________________________')
+    
+    # search stats: Node and SearchTree storage count the same nodes
+    node_stats, tree_stats = SearchStats(), SearchStats()
+    uniform_cost_search(example_mhproblem, stats=node_stats)
+    uniform_cost_search(example_mhproblem, node_factory=SearchTree(), stats=tree_stats)
+    print('UCS stats: {}'.format({k: v for k, v in node_stats.as_dict().items() if k != 'phase_times'}))
+    for key in ['nodes_generated', 'nodes_popped', 'peak_frontier', 'peak_reached', 'reopened']:
+        assert getattr(node_stats, key) == getattr(tree_stats, key)
+    assert set(node_stats.phase_times) == {'setup', 'search'}
+    print('________________________________________________________________________')
+    
+    # portfolio: several strategies in parallel, first optimal solution wins
+    winner, goal_node = portfolio_search(example_mhproblem, strategies=('bfs', 'ucs', 'astar'))
+    print('Portfolio winner: {} with cost {}'.format(winner, goal_node.path_cost))
+    assert winner in OPTIMAL_STRATEGIES and goal_node.path_cost == ucs_goal.path_cost
+    assert example_mhproblem.is_goal(goal_node.state)
+    # problem.h is inadmissible, so A* is not accepted over UCS by default
+    h_problem = GridHunterProblem(initial_agent_info=(1, 3, 'east', 5), N=4, monster_coords=[(0, 0), (3, 0), (0, 3)])
+    winner, goal_node = portfolio_search(h_problem, strategies=('astar', 'ucs'))
+    assert winner == 'ucs' and goal_node.path_cost == uniform_cost_search(h_problem).path_cost
+    # a failing strategy (no backward search over macro actions) is recorded and the others keep running
+    macro_problem = MacroGridHunterProblem(initial_agent_info=(1, 3, 'east', 5), N=4, monster_coords=[(0, 0), (3, 0), (0, 3)])
+    failures = {}
+    winner, goal_node = portfolio_search(macro_problem, strategies=('bidirectional', 'ucs'), failures=failures)
+    print('Portfolio failures: {}'.format(sorted(failures)))
+    assert winner == 'ucs' and set(failures) == {'bidirectional'}
+    # bulk solve: same costs as solving one by one
+    bulk_problems = [GridHunterProblem(initial_agent_info=(row, 4, 'north', 10), N=5, monster_coords=example_monster_coords)
+                     for row in range(5)]
+    bulk_goals = solve_many(bulk_problems, strategy='ucs', max_workers=2)
+    print('solve_many costs: {}'.format([goal.path_cost for goal in bulk_goals]))
+    assert [goal.path_cost for goal in bulk_goals] == [uniform_cost_search(p).path_cost for p in bulk_problems]
+    print('________________________________________________________________________')
+    
+    # HDA*: states partitioned over worker processes, same optimal cost as A* (with an admissible h)
+    hda_h = PatternDatabaseHeuristic(example_mhproblem, group_size=2)
+    expansions = []
+    goal_node = hda_star_search(example_mhproblem, hda_h, workers=2, expansions=expansions)
+    astar_cost = astar_search(example_mhproblem, h=hda_h).path_cost
+    print('HDA* cost {} with {} workers | A* cost {}'.format(goal_node.path_cost, len(expansions), astar_cost))
+    assert goal_node.path_cost == astar_cost == ucs_goal.path_cost
+    assert example_mhproblem.is_goal(goal_node.state) and len(expansions) == 2
+    print('________________________________________________________________________')
+    
+    # anytime weighted A*: solutions with shrinking suboptimality bounds, ending at the optimum
+    solutions = list(anytime_astar_search(example_mhproblem, h=example_mhproblem.h, weight=3.0, weight_step=1.0))
+    print('Anytime A* (cost, bound) per solution: {}'.format([(n.path_cost, round(b, 3)) for n, b in solutions]))
+    assert all(b1 > b2 for (_, b1), (_, b2) in zip(solutions, solutions[1:]))
+    assert solutions[-1][1] == 1.0 and solutions[-1][0].path_cost == ucs_goal.path_cost
+    assert list(anytime_astar_search(example_mhproblem, h=example_mhproblem.h, max_nodes=0)) == []
+    print('________________________________________________________________________')
+    
+    # pattern database heuristic: admissible, so A* stays optimal with far fewer generated nodes
+    pdb_h = PatternDatabaseHeuristic(example_mhproblem, group_size=2)
+    pdb_stats, ucs_stats = SearchStats(), SearchStats()
+    goal_node = astar_search(example_mhproblem, h=pdb_h, stats=pdb_stats)
+    uniform_cost_search(example_mhproblem, stats=ucs_stats)
+    print('PDB A* cost {} with {:,d} generated nodes | UCS cost {} with {:,d}'.format(
+          goal_node.path_cost, pdb_stats.nodes_generated, ucs_goal.path_cost, ucs_stats.nodes_generated))
+    assert goal_node.path_cost == ucs_goal.path_cost and pdb_stats.nodes_generated < ucs_stats.nodes_generated
+    assert pdb_h(Node(example_mhproblem.initial_state)) <= ucs_goal.path_cost
+    print('________________________________________________________________________')
+    
+    # macro actions: same optimal cost in fewer steps, and the plan expands back to primitive actions
+    macro_problem = MacroGridHunterProblem(initial_agent_info=(1, 4, 'north', 10), N=5, monster_coords=example_monster_coords)
+    macro_goal = uniform_cost_search(macro_problem)
+    primitive_plan = macro_problem.primitive_plan(get_path_actions(macro_goal))
+    print('Macro UCS cost {} in {} steps: {}'.format(macro_goal.path_cost, macro_goal.depth, get_path_actions(macro_goal)))
+    assert macro_goal.path_cost == ucs_goal.path_cost == len(primitive_plan) and macro_goal.depth <= ucs_goal.depth
+    state = example_mhproblem.initial_state
+    for action in primitive_plan:
+        state = example_mhproblem.result(state, action)
+    assert state == macro_goal.state and example_mhproblem.is_goal(state)
+    # no backward search over macros: bidirectional search rejects the problem up front
+    try:
+        bidirectional_search(macro_problem)
+        assert False, 'bidirectional_search should reject MacroGridHunterProblem'
+    except ValueError:
+        pass
+    print('________________________________________________________________________')
+    
+    # external-memory BFS: layers on disk, same depth as in-memory BFS on packed states
+    layer_sizes = []
+    goal_node = external_breadth_first_search(packed_problem, chunk_size=256, layers=layer_sizes)
+    print('External BFS cost {} over {} layers ({:,d} states) | BFS cost {}'.format(
+          goal_node.path_cost, len(layer_sizes), sum(layer_sizes), breadth_first_search(packed_problem).path_cost))
+    assert goal_node.path_cost == breadth_first_search(packed_problem).path_cost
+    state = packed_problem.initial_state
+    for action in get_path_actions(goal_node):
+        state = packed_problem.result(state, action)
+    assert state == goal_node.state and packed_problem.is_goal(state)
+    # unsolvable instance (the agent dies before it can kill every monster): every layer runs dry
+    dead_problem = GridHunterProblem(initial_agent_info=(1, 0, 'south', 3), N=2, monster_coords=[(0, 0), (1, 0), (1, 1)], packed=True)
+    for chunk_size in (1, 4, 1 << 16):
+        assert external_breadth_first_search(dead_problem, chunk_size=chunk_size) is None
+    assert breadth_first_search(dead_problem) is None
+    print('________________________________________________________________________')
+    
+    # fast expand path: same search, child nodes only created for children that improve on reached
+    fast_stats, slow_stats = SearchStats(), SearchStats()
+    fast_goal = uniform_cost_search(example_mhproblem, stats=fast_stats)
+    slow_goal = uniform_cost_search(example_mhproblem, fast_expand=False, stats=slow_stats)
+    print('Allocations per expansion: {:.2f} with fast_expand | {:.2f} without'.format(
+          fast_stats.nodes_allocated / fast_stats.nodes_popped, slow_stats.nodes_allocated / slow_stats.nodes_popped))
+    assert get_path_actions(fast_goal) == get_path_actions(slow_goal)
+    assert fast_stats.nodes_generated == slow_stats.nodes_generated and fast_stats.nodes_allocated < slow_stats.nodes_allocated
+    print('________________________________________________________________________')